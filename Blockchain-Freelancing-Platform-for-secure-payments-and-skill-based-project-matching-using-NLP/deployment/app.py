@@ -1,16 +1,17 @@
+import os
+import time
+import threading
 import streamlit as st
-import re
-import sqlite3
-import hashlib
-from blockchain_interface import BlockchainInterface
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
-# Initialize BlockchainInterface
-blockchain = BlockchainInterface(provider_url='HTTP://127.0.0.1:8545')  # Use Ganache or a testnet
+from web3 import Web3
+import money
+from service_client import PlatformClient, ServiceError
+from validation import is_valid_username, is_valid_email, is_valid_password
 
 st.set_page_config(layout="wide")
 
+# Projects, matching and escrow are served by `python platform_service.py`
+SERVICE_URL = os.environ.get('PLATFORM_SERVICE_URL', 'http://127.0.0.1:8600')
+
 def apply_custom_css():
     st.markdown("""
         <style>
@@ -39,197 +40,79 @@ def apply_custom_css():
             }
         </style>
     """, unsafe_allow_html=True)
-# Database setup
-def init_db():
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-
-    # Create users table
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                user_type TEXT NOT NULL,
-                wallet_address TEXT,
-                private_key TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-
-    # Create freelancer_profiles table
-    c.execute('''CREATE TABLE IF NOT EXISTS freelancer_profiles
-                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                skills TEXT NOT NULL,
-                experience INTEGER,
-                hourly_rate REAL,
-                bio TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(id))''')
-
-    # Create projects table
-    c.execute('''CREATE TABLE IF NOT EXISTS projects
-                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT NOT NULL,
-                employer_id INTEGER,
-                freelancer_id INTEGER,
-                status TEXT DEFAULT 'open',
-                budget REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                contract_address TEXT,
-                FOREIGN KEY (employer_id) REFERENCES users(id),
-                FOREIGN KEY (freelancer_id) REFERENCES users(id))''')
-
-    conn.commit()
-    conn.close()
-
-# Initialize database
-init_db()
-
-# Helper functions
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def is_valid_username(username):
-    # Check if the username is alphanumeric and does not contain spaces
-    return bool(re.match("^[a-zA-Z0-9_]*$", username))
-
-# Function to validate email
-def is_valid_email(email):
-    # Basic email pattern check
-    email_regex = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
-    return bool(re.match(email_regex, email))
-
-# Function to validate password
-def is_valid_password(password):
-    # Password must contain at least 8 characters, 1 uppercase, 1 lowercase, 1 digit, and 1 special character
-    password_regex = r"^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$"
-    return bool(re.match(password_regex, password))
-
-def create_user(username, password, email, user_type):
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-    try:
-        hashed_password = hash_password(password)
-        wallet_info = blockchain.create_wallet()
-        c.execute('''INSERT INTO users (username, password, email, user_type, wallet_address, private_key)
-                    VALUES (?, ?, ?, ?, ?, ?)''', (username, hashed_password, email, user_type, wallet_info['address'], wallet_info['private_key']))
-        user_id = c.lastrowid
-        conn.commit()
-        return user_id
-    except sqlite3.IntegrityError:
-        return None
-    finally:
-        conn.close()
-
-def verify_user(email, password):
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-    hashed_password = hash_password(password)
-    c.execute('SELECT * FROM users WHERE email = ? AND password = ?', (email, hashed_password))
-    user = c.fetchone()
-    conn.close()
-    return user
-
-def create_freelancer_profile(user_id, skills, experience, hourly_rate, bio):
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-    c.execute('''INSERT INTO freelancer_profiles (user_id, skills, experience, hourly_rate, bio)
-                VALUES (?, ?, ?, ?, ?)''', (user_id, skills, experience, hourly_rate, bio))
-    conn.commit()
-    conn.close()
-
-def get_freelancer_profile(user_id):
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-    c.execute('SELECT * FROM freelancer_profiles WHERE user_id = ?', (user_id,))
-    profile = c.fetchone()
-    conn.close()
-    return profile
-
-def create_project(title, description, employer_id, budget):
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-    c.execute('''INSERT INTO projects (title, description, employer_id, budget, contract_address)
-    VALUES (?, ?, ?, ?, ?)''', (title, description, employer_id, budget, None))
-    project_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return project_id
-
-def get_projects(employer_id=None, freelancer_id=None, status='open'):
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-    
-    query = "SELECT * FROM projects WHERE status = ?"
-    params = [status]
-
-    if employer_id:
-        query += " AND employer_id = ?"
-        params.append(employer_id)
-    elif freelancer_id:
-        query += " AND freelancer_id = ?"
-        params.append(freelancer_id)
-    
-    c.execute(query, params)
-    projects = c.fetchall()
-    conn.close()
-    return projects
-
-def get_all_freelancers():
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-    c.execute('''SELECT users.id, users.username, users.email, freelancer_profiles.skills, 
-                freelancer_profiles.experience, freelancer_profiles.hourly_rate, 
-                freelancer_profiles.bio, users.wallet_address
-                FROM users 
-                JOIN freelancer_profiles ON users.id = freelancer_profiles.user_id
-                WHERE users.user_type = 'freelancer'
-                ''')
-    freelancers = c.fetchall()
-    conn.close()
-    return freelancers
-
-def match_freelancers(project_description, required_skills):
-    freelancers = get_all_freelancers()
-    if not freelancers:
-        return []
-
-    project_text = f"{project_description} {required_skills}"
-    texts = [project_text]
-    freelancer_data = []
-
-    for freelancer in freelancers:
-        freelancer_text = f"{freelancer[3] or ''} {freelancer[4] or ''} {freelancer[6] or ''}"
-        texts.append(freelancer_text)
-        freelancer_data.append({
-            'id': freelancer[0],
-            'username': freelancer[1],
-            'email': freelancer[2],
-            'skills': freelancer[3],
-            'experience': freelancer[4],
-            'hourly_rate': freelancer[5],
-            'bio': freelancer[6],
-            'wallet_address': freelancer[7]
-        })
 
-    vectorizer = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = vectorizer.fit_transform(texts)
-    cosine_similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])
+# Process-wide resources: Streamlit reruns this script on every interaction,
+# so these are created once per server process and shared by all sessions
+@st.cache_resource
+def get_client():
+    return PlatformClient(SERVICE_URL)
+
+# Writes made through other app processes, the bulk importer or direct service
+# calls do not bump these versions, so cached reads also expire after this long
+SESSION_CACHE_TTL = 30
+
+class DataVersions:
+    """Per-table write counters shared by every session of this server process."""
 
-    for idx, score in enumerate(cosine_similarities[0]):
-        freelancer_data[idx]['match_score'] = score
-    matched_freelancers = [freelancer for freelancer in freelancer_data if freelancer['match_score'] > 0]
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._versions = {'projects': 0, 'freelancers': 0, 'wallet': 0}
 
-    # Sort the freelancers by match score in descending order
-    matched_freelancers = sorted(matched_freelancers, key=lambda x: x['match_score'], reverse=True)
+    def bump(self, *tables):
+        with self._lock:
+            self._counter += 1
+            for table in tables:
+                self._versions[table] = self._counter
 
-    return matched_freelancers
+    def get(self, table):
+        return self._versions[table]
+
+# Held by cache_resource because module globals are reset on every script rerun
+@st.cache_resource
+def get_data_versions():
+    return DataVersions()
+
+client = get_client()
+
+def end_session(page='home', notice=None):
+    st.session_state.user = None
+    st.session_state.token = None
+    st.session_state.pop('data_cache', None)
+    st.session_state.page = page
+    st.session_state.login_notice = notice
+    st.rerun()
+
+def session_expired():
+    end_session('login', "Your session has expired, please log in again.")
+
+def api():
+    # Client acting as the logged-in user; the service resolves who that is from the token.
+    # A rejected token (logged out elsewhere or expired) sends the user back to the login page.
+    return client.with_token(st.session_state.token, on_unauthorized=session_expired)
+
+def invalidate(*tables):
+    # Every session compares against these versions, so one write refreshes all of them
+    get_data_versions().bump(*tables)
+
+def session_cached(table, key, loader):
+    # Per-session memo of a read, reloaded once its table has been written to or it expires
+    if 'data_cache' not in st.session_state:
+        st.session_state.data_cache = {}
+    version = get_data_versions().get(table)
+    now = time.monotonic()
+    entry = st.session_state.data_cache.get(key)
+    if entry is None or entry[0] != version or now - entry[1] > SESSION_CACHE_TTL:
+        entry = st.session_state.data_cache[key] = (version, now, loader())
+    return entry[2]
 
 # Streamlit UI
 
 
 if 'user' not in st.session_state:
     st.session_state.user = None
+if 'token' not in st.session_state:
+    st.session_state.token = None
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
 
@@ -246,14 +129,15 @@ def sidebar_navigation():
         choice = st.sidebar.selectbox("Menu", options)
 
         if st.sidebar.button("Logout"):
-            st.session_state.user = None
-            st.session_state.page = 'home'
-            st.rerun()
+            try:
+                client.with_token(st.session_state.token).logout()
+            except ServiceError:
+                pass  # The session may already have expired
+            end_session()
 
         return choice
 
 def home_page():
-    apply_custom_css()
     st.title("Blockchain-Based Freelancing Platform")
 
     col1, col2, col3 = st.columns([1, 1, 1])
@@ -277,7 +161,6 @@ def home_page():
             st.rerun()
 
 def register_page():
-    apply_custom_css()
     st.title("Registration")
     user_type = st.session_state.registration_type
 
@@ -316,12 +199,18 @@ def register_page():
                 st.error("Passwords don't match!")
                 return
 
-            # Proceed with registration
-            user_id = create_user(username, password, email, user_type)
+            # Proceed with registration; a freelancer's profile is stored together with the account
+            profile = None
+            if user_type == 'freelancer':
+                profile = {'skills': skills, 'experience': experience, 'hourly_rate': hourly_rate, 'bio': bio}
+            try:
+                user_id = client.create_user(username, password, email, user_type, profile)
+            except ServiceError as e:
+                st.error(f"Registration failed: {str(e)}")
+                return
 
             if user_id:
-                if user_type == 'freelancer':
-                    create_freelancer_profile(user_id, skills, experience, hourly_rate, bio)
+                invalidate('freelancers')
                 st.success("Registration successful! Please login.")
                 st.session_state.page = 'login'
                 st.rerun()
@@ -329,145 +218,183 @@ def register_page():
                 st.error("Username or email already exists!")
                 
 def login_page():
-    apply_custom_css()
     st.title("Login")
+    if st.session_state.get('login_notice'):
+        st.info(st.session_state.login_notice)
 
     with st.form("login_form"):
         email = st.text_input("Email")
         password = st.text_input("Password", type="password")
 
         if st.form_submit_button("Login"):
-            user = verify_user(email, password)
-            if user:
-                st.session_state.user = user
+            try:
+                session = client.login(email, password)
+            except ServiceError as e:
+                st.error(f"Login failed: {str(e)}")
+                return
+            if session:
+                st.session_state.token = session['token']
+                st.session_state.user = tuple(session['user'])
+                st.session_state.login_notice = None
                 st.session_state.page = 'dashboard'
                 st.rerun()
             else:
                 st.error("Invalid credentials!")
 
 def post_project():
-    apply_custom_css()
     st.subheader("Post New Project")
 
     with st.form("project_form"):
         title = st.text_input("Project Title")
         description = st.text_area("Project Description")
-        budget = st.number_input("Budget ($)", min_value=0.0)
+        budget = st.number_input("Budget (ETH)", min_value=0.0, step=0.01, format="%.6f")
+        post_anyway = st.checkbox("Post even if similar projects are already open")
 
         # Validation to check if all fields are filled
         if st.form_submit_button("Post Project"):
             # Check if any field is empty or budget is zero
             if not title or not description or budget <= 0.0:
                 st.error("Please fill in all fields and set a valid budget greater than 0.")
+                return
+
+            try:
+                similar = [] if post_anyway else api().find_similar_projects(description)
+            except ServiceError as e:
+                st.error(f"Could not check for similar projects: {str(e)}")
+                return
+            if similar:
+                lines = []
+                for p in similar:
+                    owner = ", yours" if p['employer_id'] == st.session_state.user[0] else ""
+                    lines.append(f"- {p['title']} ({p['similarity']*100:.0f}% similar{owner})")
+                st.warning("This description looks like a repost of open projects:  \n" + "  \n".join(lines))
             else:
                 # Assuming create_project() returns a project ID
-                project_id = create_project(title, description, st.session_state.user[0], budget)
+                try:
+                    project_id = api().create_project(title, description, money.to_wei(budget))
+                except ServiceError as e:
+                    st.error(f"Failed to post the project: {str(e)}")
+                    return
+                invalidate('projects')
                 if project_id:
                     st.success("Project posted successfully!")
                 else:
                     st.error("Failed to post the project. Please try again.")
 
-def delete_project(project_id, employer_id):
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-    c.execute('DELETE FROM projects WHERE id = ? AND employer_id = ?', (project_id, employer_id))
-    conn.commit()
-    conn.close()
+def delete_project(project_id):
+    api().delete_project(project_id)
+    invalidate('projects')
+
+def batch_escrow_action(projects, label, action, key):
+    if not projects:
+        return
+
+    project_options = {p[0]: p[1] for p in projects}
+    selected_ids = st.multiselect(label, options=list(project_options.keys()),
+                                  format_func=lambda x: project_options[x], key=f"{key}_select")
+
+    if st.button(label, key=f"{key}_button", disabled=not selected_ids):
+        try:
+            # The service sends one signed batch, so all transactions land in about one block
+            result = action(selected_ids)
+        except ServiceError as e:
+            st.error(f"Batch transaction failed: {str(e)}")
+            return
+
+        succeeded, pending = result['succeeded'], result['pending']
+        invalidate('projects', 'wallet')
+
+        if pending:
+            st.warning(f"{len(pending)} transactions were sent but are not confirmed yet; refresh later.")
+        if len(succeeded) + len(pending) < len(selected_ids):
+            st.error(f"{len(selected_ids) - len(succeeded) - len(pending)} of {len(selected_ids)} transactions failed.")
+        elif not pending:
+            st.success(f"Updated {len(succeeded)} projects successfully!")
+            st.rerun()  # Refresh the page
 
 def view_projects(employer_id=None, freelancer_id=None, available=False):
-    apply_custom_css()
-    conn = sqlite3.connect('freelance_platform.db')
-    c = conn.cursor()
-
-    if employer_id:
-        # Show projects posted by this employer
-        c.execute('SELECT * FROM projects WHERE employer_id = ?', (employer_id,))
-    elif freelancer_id and not available:
-        # Show only assigned projects for this freelancer
-        c.execute('SELECT * FROM projects WHERE status = "assigned" AND freelancer_id = ?', (freelancer_id,))
-    elif available:
-        # Show only open projects (not assigned)
-        c.execute('SELECT * FROM projects WHERE status = "open" AND freelancer_id IS NULL')
-    else:
-        # Default: Show open projects
-        c.execute('SELECT * FROM projects WHERE status = "open"')
-
-    projects = c.fetchall()
-    conn.close()
+    projects = session_cached('projects', ('view_projects', employer_id, freelancer_id, available),
+                              lambda: api().view_projects(employer_id, freelancer_id, available))
 
     if not projects:
         st.write("No projects found.")
         return
 
+    # Batch escrow actions (contract_address is column 8)
+    if st.session_state.user[4] == 'employer':
+        batch_escrow_action(
+            [p for p in projects if p[5] == 'completed' and p[3] == st.session_state.user[0] and p[8]],
+            "Release Payment for Selected", api().release_payments, 'release_batch')
+    elif st.session_state.user[4] == 'freelancer' and not available:
+        batch_escrow_action(
+            [p for p in projects if p[5] == 'assigned' and p[4] == st.session_state.user[0] and p[8]],
+            "Mark Selected as Completed", api().complete_works, 'complete_batch')
+
     for project in projects:
-        with st.expander(f"Project: {project[1]}"):
-            st.write(f"Description: {project[2]}")
-            st.write(f"Budget: ${project[6]}")
-            st.write(f"Status: {project[5]}")
-
-            # Freelancer can apply for open projects
-            if st.session_state.user[4] == 'freelancer' and project[5] == 'open':
-                if st.button("Apply", key=f"apply_{project[0]}"):
-                    conn = sqlite3.connect('freelance_platform.db')
-                    c = conn.cursor()
-                    c.execute('UPDATE projects SET freelancer_id = ?, status = ? WHERE id = ?',
-                    (st.session_state.user[0], 'assigned', project[0]))
-                    conn.commit()
-                    conn.close()
-                    st.success("Applied successfully!")
+        project_card(project)
+
+# Each card reruns on its own when one of its buttons is clicked
+@st.fragment
+def project_card(project):
+    with st.expander(f"Project: {project[1]}"):
+        st.write(f"Description: {project[2]}")
+        st.write(f"Budget: {money.format_amount(project[6], project[9])}")
+        st.write(f"Status: {project[5]}")
+
+        # Freelancer can apply for open projects
+        if st.session_state.user[4] == 'freelancer' and project[5] == 'open':
+            if st.button("Apply", key=f"apply_{project[0]}"):
+                try:
+                    api().apply_to_project(project[0])
+                except ServiceError as e:
+                    st.error(f"Failed to apply: {str(e)}")
+                    return
+                invalidate('projects')
+                st.success("Applied successfully!")
+                st.rerun()  # Refresh the page
+
+        # Freelancer can mark assigned projects as completed (freelancer_id is column 4)
+        if st.session_state.user[4] == 'freelancer' and project[5] == 'assigned' and project[4] == st.session_state.user[0]:
+            if st.button("Mark as Completed", key=f"complete_{project[0]}"):
+                try:
+                    result = api().complete_works([project[0]])
+                    invalidate('projects', 'wallet')
+                    if result['failed']:
+                        raise ServiceError("Transaction failed")
+                    if result['pending']:
+                        st.warning("Transaction sent but not confirmed yet; refresh later.")
+                        return
+                    st.success("Job marked as completed! Waiting for employer approval.")
                     st.rerun()  # Refresh the page
-
-            # Freelancer can mark assigned projects as completed
-            if st.session_state.user[4] == 'freelancer' and project[5] == 'assigned' and project[3] == st.session_state.user[0]:
-                if st.button("Mark as Completed", key=f"complete_{project[0]}"):
-                    try:
-                        blockchain.complete_work(project[7], st.session_state.user[6])  # Freelancer's private key
-                        conn = sqlite3.connect('freelance_platform.db')
-                        c = conn.cursor()
-                        c.execute('UPDATE projects SET status = ? WHERE id = ?', ('completed', project[0]))
-                        conn.commit()
-                        conn.close()
-                        st.success("Job marked as completed! Waiting for employer approval.")
-                        st.rerun()  # Refresh the page
-                    except Exception as e:
-                        st.error(f"Failed to complete job: {str(e)}")
-
-            # Employer can release payment for completed projects
-            if st.session_state.user[4] == 'employer' and project[5] == 'completed' and project[2] == st.session_state.user[0]:
-                if st.button("Release Payment", key=f"release_{project[0]}"):
-                    try:
-                        blockchain.release_payment(project[7], st.session_state.user[6])  # Employer's private key
-                        conn = sqlite3.connect('freelance_platform.db')
-                        c = conn.cursor()
-                        c.execute('UPDATE projects SET status = ? WHERE id = ?', ('paid', project[0]))
-                        conn.commit()
-                        conn.close()
-                        st.success("Payment released successfully!")
-                        st.rerun()  # Refresh the page
-                    except Exception as e:
-                        st.error(f"Failed to release payment: {str(e)}")
-
-            # Employer can delete an open project
-            if st.session_state.user[4] == 'employer' and project[5] == 'open' and project[2] == st.session_state.user[0]:
-                if st.button("Delete Project", key=f"delete_{project[0]}"):
-                    conn = sqlite3.connect('freelance_platform.db')
-                    c = conn.cursor()
-                    c.execute('DELETE FROM projects WHERE id = ?', (project[0],))
-                    conn.commit()
-                    conn.close()
-                    st.success("Project deleted successfully!")
+                except Exception as e:
+                    st.error(f"Failed to complete job: {str(e)}")
+
+        # Employer can release payment for completed projects (employer_id is column 3)
+        if st.session_state.user[4] == 'employer' and project[5] == 'completed' and project[3] == st.session_state.user[0]:
+            if st.button("Release Payment", key=f"release_{project[0]}"):
+                try:
+                    result = api().release_payments([project[0]])
+                    invalidate('projects', 'wallet')
+                    if result['failed']:
+                        raise ServiceError("Transaction failed")
+                    if result['pending']:
+                        st.warning("Transaction sent but not confirmed yet; refresh later.")
+                        return
+                    st.success("Payment released successfully!")
                     st.rerun()  # Refresh the page
-                    
-            if st.session_state.user[4] == 'employer' and project[5] == 'open':  # Ensure only employers see the delete option
-                if st.button("Delete Project", key=f"delete_{project[0]}"):
-                    delete_project(project[0], employer_id)
-                    st.success("Project deleted successfully!")
-                    st.rerun()
+                except Exception as e:
+                    st.error(f"Failed to release payment: {str(e)}")
+
+        # Employer can delete an open project (employer_id is column 3)
+        if st.session_state.user[4] == 'employer' and project[5] == 'open' and project[3] == st.session_state.user[0]:
+            if st.button("Delete Project", key=f"delete_{project[0]}"):
+                delete_project(project[0])
+                st.success("Project deleted successfully!")
+                st.rerun()  # Refresh the page
 # Add at the top with other session state initializations
 if 'refresh_projects' not in st.session_state:
     st.session_state.refresh_projects = False
 def find_freelancers_page():
-    apply_custom_css()
     st.subheader("Find Freelancers")
 
     # Preserve search parameters across reruns
@@ -479,7 +406,9 @@ def find_freelancers_page():
         }
 
     # Project selection
-    projects = get_projects(employer_id=st.session_state.user[0], status='open')
+    employer_id = st.session_state.user[0]
+    projects = session_cached('projects', ('open_projects', employer_id),
+                              lambda: api().get_projects(employer_id=employer_id, status='open'))
     if not projects:
         st.warning("You have no open projects. Please post a project first.")
         return
@@ -525,7 +454,8 @@ def find_freelancers_page():
         show_freelancer_matches(selected_project_id, project_description, required_skills)
 
 def show_freelancer_matches(project_id, description, skills):
-    matched_freelancers = match_freelancers(description, skills)
+    matched_freelancers = session_cached('freelancers', ('matches', description, skills),
+                                         lambda: api().match_freelancers(description, skills))
     
     if not matched_freelancers:
         st.info("No freelancers found matching your requirements.")
@@ -534,54 +464,35 @@ def show_freelancer_matches(project_id, description, skills):
     st.write("### Matched Freelancers")
     
     for freelancer in matched_freelancers:
-        with st.container():
-            col1, col2, col3 = st.columns([3, 2, 1])
-            with col1:
-                st.markdown(f"**{freelancer['username']}**  \n"
-                            f"Skills: {freelancer['skills']}  \n"
-                            f"Experience: {freelancer['experience']} yrs  \n" 
-                            f"Rate: ${freelancer['hourly_rate']}/hr")
-            
-            with col2:
-                st.markdown(f"Match Score: {freelancer['match_score']*100:.1f}%  \n"
-                            f"Wallet: `{freelancer['wallet_address']}`")
-            
-            with col3:
-                if st.button(
-                    "Hire",
-                    key=f"hire_{freelancer['id']}_{project_id}",
-                    use_container_width=True
-                ):
-                    handle_hire_action(project_id, freelancer)
+        freelancer_match_card(project_id, freelancer)
+
+@st.fragment
+def freelancer_match_card(project_id, freelancer):
+    with st.container():
+        col1, col2, col3 = st.columns([3, 2, 1])
+        with col1:
+            st.markdown(f"**{freelancer['username']}**  \n"
+                        f"Skills: {freelancer['skills']}  \n"
+                        f"Experience: {freelancer['experience']} yrs  \n" 
+                        f"Rate: ${freelancer['hourly_rate']}/hr")
+        
+        with col2:
+            st.markdown(f"Match Score: {freelancer['match_score']*100:.1f}%  \n"
+                        f"Wallet: `{freelancer['wallet_address']}`")
+        
+        with col3:
+            if st.button(
+                "Hire",
+                key=f"hire_{freelancer['id']}_{project_id}",
+                use_container_width=True
+            ):
+                handle_hire_action(project_id, freelancer)
 
 def handle_hire_action(project_id, freelancer):
     try:
-        # Get project details
-        conn = sqlite3.connect('freelance_platform.db')
-        c = conn.cursor()
-        c.execute('SELECT * FROM projects WHERE id = ?', (project_id,))
-        project = c.fetchone()
-        
-        if not project:
-            st.error("Project not found!")
-            return
-
-        # Deploy smart contract
-        contract_address = blockchain.deploy_contract(
-            employer_private_key=st.session_state.user[6],
-            freelancer_address=freelancer['wallet_address'],
-            job_description=project[2],  # project description
-            amount=project[6]  # project budget
-        )
-
-        # Update project in database
-        c.execute('''UPDATE projects 
-                    SET freelancer_id = ?, 
-                        status = ?, 
-                        contract_address = ? 
-                    WHERE id = ?''',
-                (freelancer['id'], 'assigned', contract_address, project_id))
-        conn.commit()
+        # The service deploys the escrow contract and assigns the freelancer
+        contract_address = api().hire_freelancer(project_id, freelancer['id'])
+        invalidate('projects', 'wallet')
         
         # Update session state
         st.session_state.refresh_projects = False
@@ -590,33 +501,58 @@ def handle_hire_action(project_id, freelancer):
         # Force refresh the UI
         st.rerun()
     
-    except sqlite3.Error as e:
-        st.error(f"Database error: {str(e)}")
-    except Exception as e:
-        st.error(f"Contract deployment failed: {str(e)}")
-    finally:
-        conn.close()
+    except ServiceError as e:
+        if e.status == 404:
+            st.error("Project not found!")
+        else:
+            st.error(f"Contract deployment failed: {str(e)}")
 
 def wallet_page():
-    apply_custom_css()
     st.subheader("Wallet")
 
     wallet_address = st.session_state.user[5]
-    private_key = st.session_state.user[6]
 
     if wallet_address:
+        # The key is never part of the login response, only of this authenticated call
+        private_key = api().get_wallet()['private_key']
         # Convert the address to checksum format
-        checksum_address = blockchain.w3.to_checksum_address(wallet_address)
+        checksum_address = Web3.to_checksum_address(wallet_address)
         
         st.write("### Your Wallet Details")
         st.code(f"Address: {checksum_address}")
         st.code(f"Private Key: {private_key}")
 
-        # Get balance using the checksum address
-        balance = blockchain.w3.eth.get_balance(checksum_address)
-        st.write(f"Balance: {blockchain.w3.from_wei(balance, 'ether')} ETH")
+        wallet_balance(checksum_address)
+
+        # Summed exactly in wei by the service
+        user_id = st.session_state.user[0]
+        if st.session_state.user[4] == 'employer':
+            label = "Held in escrow"
+            totals = session_cached('projects', ('escrow_totals', user_id),
+                                    lambda: api().escrow_totals())
+        else:
+            label = "Received from paid projects"
+            totals = session_cached('projects', ('payout_totals', user_id),
+                                    lambda: api().payout_totals())
+        for total in totals:
+            st.write(f"{label}: {money.format_amount(total['amount_wei'], total['currency'])} "
+                     f"({total['projects']} projects)")
+        if not totals:
+            st.write(f"{label}: {money.format_amount(0)}")
+
+# Only the balance reruns when it is refreshed
+@st.fragment
+def wallet_balance(checksum_address):
+    if st.button("Refresh Balance", key="refresh_balance"):
+        invalidate('wallet')
+
+    # Get balance using the checksum address
+    balance = session_cached('wallet', ('balance', checksum_address),
+                             lambda: api().get_balance(checksum_address))
+    st.write(f"Balance: {money.format_amount(balance)}")
 
 def main():
+    apply_custom_css()
     if st.session_state.page == 'home':
         home_page()
     elif st.session_state.page == 'register':
@@ -625,16 +561,6 @@ def main():
         login_page()
     elif st.session_state.page == 'dashboard':
         choice = sidebar_navigation()
-        wallet_address = st.session_state.user[5]  # Employer's wallet address
-        balance_wei = blockchain.w3.eth.get_balance(wallet_address)
-        balance_eth = blockchain.w3.from_wei(balance_wei, 'ether')
-        # st.write(f"Employer Wallet Balance: {wallet_address} ETH")
-
-        #st.write(f"Employer Wallet Balance: {balance_eth} ETH")
-
-        # if balance_eth < 0.01:  # Set a minimum balance threshold
-        #     st.error("⚠️ Insufficient funds! Add ETH to your wallet before proceeding.")
-        #     st.stop()
 
         if not choice:
             return
@@ -656,7 +582,8 @@ def main():
             wallet_page()
         elif choice == "My Profile":
             st.subheader("My Profile")
-            profile = get_freelancer_profile(st.session_state.user[0])
+            user_id = st.session_state.user[0]
+            profile = session_cached('freelancers', ('profile', user_id), lambda: api().get_freelancer_profile(user_id))
             if profile:
                 st.write(f"Skills: {profile[2]}")
                 st.write(f"Experience: {profile[3]} years")
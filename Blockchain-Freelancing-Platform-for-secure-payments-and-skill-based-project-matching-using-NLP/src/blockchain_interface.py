@@ -1,10 +1,13 @@
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 from eth_account import Account
 import json
-from web3 import Web3
+import time
+from rpc_transport import get_provider
+import money
 
 # Connect to Ganache
-w3 = Web3(Web3.HTTPProvider("HTTP://127.0.0.1:8545"))
+w3 = Web3(get_provider("HTTP://127.0.0.1:8545"))
 
 # # Select a Ganache account with ETH
 # rich_account = w3.eth.accounts[1]  # First account (usually has 100 ETH)
@@ -25,8 +28,11 @@ balance_eth = w3.from_wei(balance_wei, 'ether')
 print(f"Employer Wallet New Balance: {balance_eth} ETH")
 
 class BlockchainInterface:
-    def __init__(self, provider_url: str = 'HTTP://127.0.0.1:8545'):
-        self.w3 = Web3(Web3.HTTPProvider(provider_url))
+    def __init__(self, provider_url: str = 'HTTP://127.0.0.1:8545', ledger=None):
+        # Shared pooled provider, so every instance in the process reuses one connection pool
+        self.w3 = Web3(get_provider(provider_url))
+        # Optional TxLedger that records gas and latency for every mined transaction
+        self.ledger = ledger
         
         # Load contract ABI and bytecode
         with open('contracts/FreelanceContract.json', 'r') as f:
@@ -42,8 +48,12 @@ class BlockchainInterface:
             'private_key': account.key.hex()
         }
     
-    def deploy_contract(self, employer_private_key: str, freelancer_address: str, job_description: str, amount: float) -> str:
-        """Deploy a new freelance contract with balance check."""
+    def deploy_contract(self, employer_private_key: str, freelancer_address: str, job_description: str, amount_wei: int,
+                        on_broadcast=None) -> str:
+        """Deploy a new freelance contract with balance check; amount_wei is escrowed in it.
+
+        on_broadcast(tx_hash) is called once the node accepts the deployment.
+        """
 
         try:
             # Convert freelancer address to checksum format
@@ -55,12 +65,8 @@ class BlockchainInterface:
 
             # Check employer's balance
             balance_wei = self.w3.eth.get_balance(employer_address)
-            balance_eth = self.w3.from_wei(balance_wei, 'ether')
 
-            print(f"Employer's Wallet Balance: {balance_eth} ETH")
-
-            # Convert amount to Wei for contract deployment
-            amount_wei = self.w3.to_wei(amount, 'ether')
+            print(f"Employer's Wallet Balance: {money.format_amount(balance_wei)}")
 
             # Estimate gas cost
             estimated_gas = 2000000  # Hardcoded; modify based on contract complexity
@@ -70,8 +76,8 @@ class BlockchainInterface:
             total_required = gas_cost + amount_wei  # Total ETH required
 
             # Debugging: Display required ETH
-            print(f"Gas Cost Estimate: {self.w3.from_wei(gas_cost, 'ether')} ETH")
-            print(f"Total Required: {self.w3.from_wei(total_required, 'ether')} ETH")
+            print(f"Gas Cost Estimate: {money.format_amount(gas_cost)}")
+            print(f"Total Required: {money.format_amount(total_required)}")
 
             # Check if employer has enough funds
             if balance_wei < total_required:
@@ -100,10 +106,13 @@ class BlockchainInterface:
 
             # Sign and send transaction
             signed_txn = self.w3.eth.account.sign_transaction(construct_txn, employer_private_key)
+            submitted_at = time.monotonic()
             tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            if on_broadcast:
+                on_broadcast(tx_hash)
 
             # Wait for transaction receipt
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            tx_receipt = self._wait_for_receipt(tx_hash, 'deploy', gas_price, submitted_at)
             print(f"Contract successfully deployed at: {tx_receipt.contractAddress}")
 
             return tx_receipt.contractAddress
@@ -112,6 +121,87 @@ class BlockchainInterface:
             raise Exception(f"Failed to deploy contract: {str(e)}")
 
     
+    def _wait_for_receipt(self, tx_hash, action: str, gas_price: int, submitted_at: float, contract_address: str = None):
+        """Wait for a transaction to be mined and record it in the ledger."""
+        tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        if self.ledger:
+            # Metrics are best effort: the transaction is mined whatever the ledger does
+            try:
+                self.ledger.record(action, tx_receipt, gas_price, time.monotonic() - submitted_at, contract_address)
+            except Exception as e:
+                print(f"Failed to record {action} transaction {tx_hash.hex()} in the ledger: {str(e)}")
+        return tx_receipt
+
+    def _send_batch(self, private_key: str, action: str, build_txs: list, contract_addresses: list = None,
+                    on_broadcast=None) -> list:
+        """Sign a batch of transactions with consecutive nonces, broadcast them and await all receipts.
+
+        Each entry of build_txs turns the shared from/nonce/gas parameters into
+        a transaction. on_broadcast(offset, tx_hash) is called as soon as the
+        node accepts each one, so callers can persist the hash before waiting.
+        Receipts are returned in order. An entry is None if its transaction
+        was never sent (later nonces after a failed broadcast) or if its
+        receipt could not be fetched; the latter may still be mined.
+        """
+        contract_addresses = contract_addresses or [None] * len(build_txs)
+        account = Account.from_key(private_key)
+        nonce = self.w3.eth.get_transaction_count(account.address, 'pending')
+        gas_price = self.w3.eth.gas_price
+
+        signed_txns = []
+        for offset, build_tx in enumerate(build_txs):
+            tx = build_tx({
+                'from': account.address,
+                'nonce': nonce + offset,
+                'gas': 2000000,
+                'gasPrice': gas_price
+            })
+            signed_txns.append(self.w3.eth.account.sign_transaction(tx, private_key))
+
+        tx_hashes = []
+        submitted_at = time.monotonic()
+        for offset, signed_txn in enumerate(signed_txns):
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            except Exception as e:
+                # Later nonces can never be mined past the gap, so stop here
+                print(f"Batch broadcast stopped after {len(tx_hashes)} transactions: {str(e)}")
+                break
+            tx_hashes.append(tx_hash)
+            if on_broadcast:
+                on_broadcast(offset, tx_hash)
+
+        receipts = []
+        for tx_hash, contract_address in zip(tx_hashes, contract_addresses):
+            try:
+                receipts.append(self._wait_for_receipt(tx_hash, action, gas_price, submitted_at, contract_address))
+            except Exception as e:
+                # One timeout or node error must not lose the receipts of the rest of the batch
+                print(f"No receipt for {tx_hash.hex()}: {str(e)}")
+                receipts.append(None)
+        return receipts + [None] * (len(signed_txns) - len(receipts))
+
+    def get_receipt(self, tx_hash):
+        """Receipt of a broadcast transaction, or None if it is not mined (yet)."""
+        try:
+            return self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+
+    def fund_wallets(self, funder_private_key: str, payments: list, on_broadcast=None) -> list:
+        """Send ETH to many wallets, given as (address, amount_wei) pairs, in one batch."""
+        chain_id = self.w3.eth.chain_id
+        return self._send_batch(funder_private_key, 'fund', [
+            lambda params, address=address, amount_wei=amount_wei: {
+                **params,
+                'to': self.w3.to_checksum_address(address),
+                'value': amount_wei,
+                'gas': 21000,
+                'chainId': chain_id
+            }
+            for address, amount_wei in payments
+        ], on_broadcast=on_broadcast)
+
     def get_contract(self, contract_address: str):
         """Get contract instance at specified address."""
         return self.w3.eth.contract(
@@ -132,8 +222,9 @@ class BlockchainInterface:
         })
         
         signed_txn = self.w3.eth.account.sign_transaction(tx, freelancer_private_key)
+        submitted_at = time.monotonic()
         tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        return self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        return self._wait_for_receipt(tx_hash, 'start', tx['gasPrice'], submitted_at, contract_address)
     
     def complete_work(self, contract_address: str, freelancer_private_key: str):
         """Mark work as complete (called by freelancer)."""
@@ -148,8 +239,9 @@ class BlockchainInterface:
         })
         
         signed_txn = self.w3.eth.account.sign_transaction(tx, freelancer_private_key)
+        submitted_at = time.monotonic()
         tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        return self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        return self._wait_for_receipt(tx_hash, 'complete', tx['gasPrice'], submitted_at, contract_address)
     
     def release_payment(self, contract_address: str, employer_private_key: str):
         """Release payment to freelancer (called by employer)."""
@@ -164,15 +256,30 @@ class BlockchainInterface:
         })
         
         signed_txn = self.w3.eth.account.sign_transaction(tx, employer_private_key)
+        submitted_at = time.monotonic()
         tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        return self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        return self._wait_for_receipt(tx_hash, 'release', tx['gasPrice'], submitted_at, contract_address)
     
+    def complete_works(self, contract_addresses: list, freelancer_private_key: str, on_broadcast=None) -> list:
+        """Mark work as complete on several contracts in one batch (called by freelancer)."""
+        return self._send_batch(freelancer_private_key, 'complete', [
+            self.get_contract(address).functions.completeWork().build_transaction
+            for address in contract_addresses
+        ], contract_addresses, on_broadcast)
+
+    def release_payments(self, contract_addresses: list, employer_private_key: str, on_broadcast=None) -> list:
+        """Release payment on several contracts in one batch (called by employer)."""
+        return self._send_batch(employer_private_key, 'release', [
+            self.get_contract(address).functions.releasePayment().build_transaction
+            for address in contract_addresses
+        ], contract_addresses, on_broadcast)
+
     def get_contract_status(self, contract_address: str) -> dict:
         """Get current contract status and details."""
         contract = self.get_contract(contract_address)
         return {
             'status': contract.functions.getProjectStatus().call(),
-            'balance': self.w3.from_wei(contract.functions.getContractBalance().call(), 'ether'),
+            'balance': money.from_wei(contract.functions.getContractBalance().call()),
             'employer': contract.functions.employer().call(),
             'freelancer': contract.functions.freelancer().call(),
             'is_completed': contract.functions.isCompleted().call(),
@@ -0,0 +1,308 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from eth_account import Account
+
+import money
+from platform_service import init_db
+from validation import hash_password, validate_registration
+
+# JSONL values can be any JSON type; these must be strings (or missing)
+TEXT_FIELDS = ('username', 'email', 'password', 'user_type', 'skills', 'bio')
+
+FUNDING_QUEUE_SCHEMA = '''(id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                wallet_address TEXT NOT NULL,
+                status TEXT DEFAULT 'pending',
+                tx_hash TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                amount_gwei INTEGER NOT NULL,
+                amount_wei_remainder INTEGER NOT NULL DEFAULT 0,
+                currency TEXT NOT NULL DEFAULT 'ETH',
+                FOREIGN KEY (user_id) REFERENCES users(id))'''
+
+
+def read_records(path: str):
+    """Stream (line_number, record) pairs from a CSV or JSONL file."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, {'_error': f"Invalid JSON: {e.msg}"}
+                    continue
+                if not isinstance(record, dict):
+                    record = {'_error': "Record must be a JSON object!"}
+                yield line_number, record
+        else:
+            # Header is line 1, so the first record is line 2
+            for line_number, record in enumerate(csv.DictReader(f), start=2):
+                yield line_number, record
+
+
+def validate_record(record: dict):
+    """Validate one import record with the registration rules, returning an error or None."""
+    if '_error' in record:
+        return record['_error']
+    for field in TEXT_FIELDS:
+        if record.get(field) is not None and not isinstance(record[field], str):
+            return f"{field} must be a string!"
+
+    username = (record.get('username') or '').strip()
+    email = (record.get('email') or '').strip()
+    password = record.get('password') or ''
+    user_type = (record.get('user_type') or '').strip().lower()
+
+    error = validate_registration(username, email, password, user_type, record.get('skills'))
+    if error:
+        return error
+
+    if user_type == 'freelancer':
+        try:
+            int(record.get('experience') or 0)
+            float(record.get('hourly_rate') or 0)
+        except (TypeError, ValueError):
+            return "Experience and hourly rate must be numeric!"
+    return None
+
+
+def _prepare_batch(batch: list) -> list:
+    """Hash passwords and generate wallets for a batch of validated records."""
+    prepared = []
+    for line_number, record in batch:
+        account = Account.create()
+        user_type = record['user_type'].strip().lower()
+        prepared.append({
+            'line_number': line_number,
+            'username': record['username'].strip(),
+            'email': record['email'].strip(),
+            'password': hash_password(record['password']),
+            'user_type': user_type,
+            'wallet_address': account.address,
+            'private_key': account.key.hex(),
+            'skills': record.get('skills') if user_type == 'freelancer' else None,
+            'experience': int(record.get('experience') or 0),
+            'hourly_rate': float(record.get('hourly_rate') or 0),
+            'bio': record.get('bio') or '',
+        })
+    return prepared
+
+
+def _init_funding_queue(conn):
+    conn.execute(f'CREATE TABLE IF NOT EXISTS funding_queue {FUNDING_QUEUE_SCHEMA}')
+    # Queues created before wei storage hold a REAL ether amount
+    money.migrate_amount_column(conn, 'funding_queue', FUNDING_QUEUE_SCHEMA, 'amount', 'amount')
+
+
+def _write_batch(conn, prepared: list, fund_wei: int):
+    """Insert a batch in one transaction, returning the rows rejected as duplicates."""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        usernames = [row['username'] for row in prepared]
+        emails = [row['email'] for row in prepared]
+        taken = set()
+        for column, values in (('username', usernames), ('email', emails)):
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(values), 500):
+                chunk = values[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                taken.update(r[0] for r in conn.execute(
+                    f'SELECT {column} FROM users WHERE {column} IN ({placeholders})', chunk))
+
+        rejected = [row for row in prepared if row['username'] in taken or row['email'] in taken]
+        rows = [row for row in prepared if row['username'] not in taken and row['email'] not in taken]
+
+        # Assign ids up front so profiles can be inserted with executemany as well
+        next_id = conn.execute('''SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'users'), 0),
+                                  COALESCE((SELECT MAX(id) FROM users), 0))''').fetchone()[0] + 1
+        for offset, row in enumerate(rows):
+            row['id'] = next_id + offset
+
+        conn.executemany('''INSERT INTO users (id, username, password, email, user_type, wallet_address, private_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                    [(r['id'], r['username'], r['password'], r['email'], r['user_type'],
+                      r['wallet_address'], r['private_key']) for r in rows])
+        conn.executemany('''INSERT INTO freelancer_profiles (user_id, skills, experience, hourly_rate, bio)
+                    VALUES (?, ?, ?, ?, ?)''',
+                    [(r['id'], r['skills'], r['experience'], r['hourly_rate'], r['bio'])
+                     for r in rows if r['user_type'] == 'freelancer'])
+        if fund_wei:
+            amount_gwei, amount_wei_remainder = money.split_wei(fund_wei)
+            conn.executemany('''INSERT INTO funding_queue (user_id, wallet_address, amount_gwei, amount_wei_remainder)
+                        VALUES (?, ?, ?, ?)''',
+                             [(r['id'], r['wallet_address'], amount_gwei, amount_wei_remainder) for r in rows])
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    return rejected
+
+
+def import_accounts(path: str, db_path: str, error_path: str, batch_size: int = 5000,
+                    workers: int = None, fund_wei: int = None) -> dict:
+    """Bulk import users, freelancer profiles and wallets from a CSV or JSONL file.
+
+    Records are validated as they stream in, key pairs are generated in a
+    process pool and each batch is written with executemany in a single
+    transaction. Rejected rows are written to error_path with their line
+    number and reason. If fund_wei is set, every new wallet is queued for
+    a later run_funding() pass.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Importing into a fresh database is allowed, so make sure the tables exist
+    init_db(db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    _init_funding_queue(conn)
+    stats = {'read': 0, 'imported': 0, 'failed': 0}
+    seen = set()
+    started = time.time()
+
+    with open(error_path, 'w', newline='', encoding='utf-8') as error_file, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        errors = csv.writer(error_file)
+        errors.writerow(['line_number', 'username', 'email', 'error'])
+
+        def reject(line_number, record, message):
+            errors.writerow([line_number, record.get('username'), record.get('email'), message])
+            stats['failed'] += 1
+
+        def flush(future):
+            prepared = future.result()
+            rejected = _write_batch(conn, prepared, fund_wei)
+            for row in rejected:
+                reject(row['line_number'], row, "Username or email already exists!")
+            stats['imported'] += len(prepared) - len(rejected)
+
+        # Bounded number of batches in flight keeps memory flat
+        pending = deque()
+        batch = []
+        for line_number, record in read_records(path):
+            stats['read'] += 1
+            error = validate_record(record)
+            if error is None:
+                keys = (('username', record['username'].strip()), ('email', record['email'].strip()))
+                if keys[0] in seen or keys[1] in seen:
+                    error = "Duplicate username or email in import file!"
+                seen.update(keys)
+            if error:
+                reject(line_number, record, error)
+                continue
+
+            batch.append((line_number, record))
+            if len(batch) >= batch_size:
+                pending.append(pool.submit(_prepare_batch, batch))
+                batch = []
+                if len(pending) >= workers * 2:
+                    flush(pending.popleft())
+
+        if batch:
+            pending.append(pool.submit(_prepare_batch, batch))
+        while pending:
+            flush(pending.popleft())
+
+    conn.close()
+    stats['seconds'] = time.time() - started
+    stats['rows_per_second'] = stats['read'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+
+def _mark_mined(c, mined: list) -> int:
+    """Set sent/failed for (queue_id, receipt) pairs, returning how many succeeded."""
+    c.executemany('UPDATE funding_queue SET status = ? WHERE id = ?',
+                  [('sent' if receipt.status == 1 else 'failed', queue_id) for queue_id, receipt in mined])
+    return sum(1 for _, receipt in mined if receipt.status == 1)
+
+
+def _reconcile_broadcast(conn, blockchain) -> int:
+    """Resolve rows broadcast by an earlier run whose receipt was never recorded."""
+    c = conn.cursor()
+    c.execute("SELECT id, tx_hash FROM funding_queue WHERE status = 'broadcast'")
+    broadcast = c.fetchall()
+    mined = [(queue_id, blockchain.get_receipt(tx_hash)) for queue_id, tx_hash in broadcast]
+    mined = [(queue_id, receipt) for queue_id, receipt in mined if receipt is not None]
+    funded = _mark_mined(c, mined)
+    conn.commit()
+    if len(mined) < len(broadcast):
+        # Never re-queued automatically: the transaction may still be mined
+        print(f"{len(broadcast) - len(mined)} funding transactions are broadcast but not mined yet")
+    return funded
+
+
+def run_funding(db_path: str, blockchain, funder_private_key: str, batch_size: int = 100) -> int:
+    """Send queued testnet funding in batches, returning the number of wallets funded.
+
+    Each row is marked 'broadcast' with its tx hash as soon as the node
+    accepts it, so a timeout or crash never sends the same funding twice;
+    the next run looks up receipts for those rows instead.
+    """
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    _init_funding_queue(conn)
+    try:
+        funded = _reconcile_broadcast(conn, blockchain)
+        while True:
+            c.execute('''SELECT id, wallet_address, amount_gwei, amount_wei_remainder FROM funding_queue
+                        WHERE status = 'pending' ORDER BY id LIMIT ?''', (batch_size,))
+            queued = c.fetchall()
+            if not queued:
+                break
+
+            broadcast = []
+
+            def mark_broadcast(offset, tx_hash):
+                c.execute("UPDATE funding_queue SET status = 'broadcast', tx_hash = ? WHERE id = ?",
+                          (tx_hash.hex(), queued[offset][0]))
+                conn.commit()
+                broadcast.append(offset)
+
+            receipts = blockchain.fund_wallets(funder_private_key,
+                                               [(row[1], money.join_wei(row[2], row[3])) for row in queued],
+                                               on_broadcast=mark_broadcast)
+            funded += _mark_mined(c, [(row[0], receipt) for row, receipt in zip(queued, receipts)
+                                      if receipt is not None])
+            conn.commit()
+            if len(broadcast) < len(queued):
+                # The rest stay pending; retrying now would hit the same broadcast error
+                print(f"Stopped with {len(queued) - len(broadcast)} wallets still pending")
+                break
+    finally:
+        conn.close()
+    return funded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk onboarding of users, profiles and wallets.")
+    parser.add_argument('--db', default='freelance_platform.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="Import accounts from a CSV or JSONL file")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--errors', default='import_errors.csv')
+    import_parser.add_argument('--batch-size', type=int, default=5000)
+    import_parser.add_argument('--workers', type=int, default=None)
+    import_parser.add_argument('--fund-eth', type=money.to_wei, default=None,
+                               help="Queue this much testnet ETH for every imported wallet")
+
+    fund_parser = commands.add_parser('fund', help="Send queued testnet funding")
+    fund_parser.add_argument('--provider-url', default='HTTP://127.0.0.1:8545')
+    fund_parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        stats = import_accounts(args.path, args.db, args.errors, args.batch_size, args.workers, args.fund_eth)
+        print(f"Read {stats['read']} rows in {stats['seconds']:.1f}s ({stats['rows_per_second']:.0f} rows/s): "
+              f"{stats['imported']} imported, {stats['failed']} failed (see {args.errors})")
+    else:
+        from blockchain_interface import BlockchainInterface
+        funder_key = os.environ['FUNDER_PRIVATE_KEY']
+        funded = run_funding(args.db, BlockchainInterface(args.provider_url), funder_key, args.batch_size)
+        print(f"Funded {funded} wallets")
@@ -0,0 +1,80 @@
+import queue
+import sqlite3
+import threading
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection whose close() hands it back to its pool."""
+
+    pool = None
+    idle = False
+
+    def close(self):
+        if self.pool is None:
+            return super().close()
+        if self.idle:
+            return
+        # Never hand out a connection with someone else's open transaction
+        if self.in_transaction:
+            self.rollback()
+        self.pool.release(self)
+
+
+class ConnectionPool:
+    """Process-wide pool of SQLite connections shared by request threads.
+
+    Callers keep the usual connect() ... close() pattern; close() returns the
+    connection to the pool instead of discarding it.
+    """
+
+    def __init__(self, db_path: str = 'freelance_platform.db', size: int = 8, timeout: float = 30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._size = size
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               factory=PooledConnection)
+        # WAL lets readers carry on while a writer commits
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.pool = self
+        return conn
+
+    def connect(self) -> sqlite3.Connection:
+        """Borrow a connection, opening a new one while the pool is below its size."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+        if conn is None:
+            with self._lock:
+                can_open = self._created < self._size
+                self._created += can_open
+            if can_open:
+                try:
+                    conn = self._open()
+                except BaseException:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._idle.get(timeout=self.timeout)
+        conn.idle = False
+        return conn
+
+    def release(self, conn):
+        conn.idle = True
+        self._idle.put_nowait(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.pool = None
+            conn.close()
@@ -0,0 +1,405 @@
+import os
+import re
+import time
+import shutil
+import sqlite3
+import argparse
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+# Hashed feature space shared by the rebuild workers and the query side
+N_FEATURES = 2 ** 20
+CURRENT_FILE = 'CURRENT'
+
+_FREELANCER_CHUNK_QUERY = '''SELECT users.id, freelancer_profiles.id, freelancer_profiles.skills,
+                freelancer_profiles.experience, freelancer_profiles.bio
+                FROM users
+                JOIN freelancer_profiles ON users.id = freelancer_profiles.user_id
+                WHERE users.user_type = 'freelancer'
+                AND (users.id, freelancer_profiles.id) > (?, ?)
+                ORDER BY users.id, freelancer_profiles.id
+                LIMIT ?'''
+
+# Profiles added since a build, in insertion order whatever their user id
+_NEW_PROFILES_QUERY = '''SELECT users.id, freelancer_profiles.id, freelancer_profiles.skills,
+                freelancer_profiles.experience, freelancer_profiles.bio
+                FROM freelancer_profiles
+                JOIN users ON users.id = freelancer_profiles.user_id
+                WHERE users.user_type = 'freelancer'
+                AND freelancer_profiles.id > ?
+                ORDER BY freelancer_profiles.id
+                LIMIT ?'''
+
+
+def _vectorizer():
+    # Stateless, so every worker process produces identical columns
+    return HashingVectorizer(n_features=N_FEATURES, stop_words='english',
+                             alternate_sign=False, norm=None)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize profile or query text before vectorization."""
+    text = unicodedata.normalize('NFKC', text).lower()
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def profile_text(skills, experience, bio) -> str:
+    """Build the matching text for a freelancer profile."""
+    return normalize_text(f"{skills or ''} {experience or ''} {bio or ''}")
+
+
+def iter_freelancer_chunks(db_path: str, chunk_size: int = 1000):
+    """Yield freelancer profile rows in keyset-paged chunks ordered by user id."""
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    last_key = (0, 0)
+    try:
+        while True:
+            c.execute(_FREELANCER_CHUNK_QUERY, (*last_key, chunk_size))
+            rows = c.fetchall()
+            if not rows:
+                break
+            yield rows
+            last_key = (rows[-1][0], rows[-1][1])
+    finally:
+        conn.close()
+
+
+def iter_new_profiles(db_path: str, after_profile_id: int, chunk_size: int = 1000):
+    """Yield freelancer profile rows with a profile id above after_profile_id."""
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    try:
+        while True:
+            c.execute(_NEW_PROFILES_QUERY, (after_profile_id, chunk_size))
+            rows = c.fetchall()
+            if not rows:
+                break
+            yield rows
+            after_profile_id = rows[-1][1]
+    finally:
+        conn.close()
+
+
+def _max_profile_id(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT COALESCE(MAX(id), 0) FROM freelancer_profiles').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _vectorize_chunk(shard_path: str, rows: list):
+    """Vectorize one chunk of profiles and write it as a term-count shard."""
+    texts = [profile_text(row[2], row[3], row[4]) for row in rows]
+    matrix = _vectorizer().transform(texts).tocsr()
+    matrix.sum_duplicates()
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    sp.save_npz(shard_path, matrix)
+    np.save(shard_path + '.ids.npy', ids)
+    columns, counts = np.unique(matrix.indices, return_counts=True)
+    return shard_path, matrix.shape[0], matrix.nnz, columns, counts
+
+
+def rebuild_index(db_path: str, index_dir: str, chunk_size: int = 1000, workers: int = None) -> str:
+    """Rebuild the freelancer matching index and publish it as a new generation.
+
+    Profiles are streamed from SQLite, vectorized by a process pool and merged
+    shard by shard into preallocated arrays, so memory stays bounded by the
+    chunk size. Readers keep using the previous generation until CURRENT is
+    swapped.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(index_dir, exist_ok=True)
+    generation = f"gen-{time.time_ns()}"
+    build_dir = os.path.join(index_dir, f".{generation}.tmp")
+    shard_dir = os.path.join(build_dir, 'shards')
+    os.makedirs(shard_dir)
+    # Taken before streaming: profiles inserted during the build land above it
+    # and are picked up by search() until the next rebuild
+    max_profile_id = _max_profile_id(db_path)
+
+    shards = {}
+    doc_freq = np.zeros(N_FEATURES, dtype=np.int64)
+    n_rows = n_nnz = 0
+
+    def collect(done):
+        nonlocal n_rows, n_nnz
+        for future in done:
+            shard_path, rows, nnz, columns, counts = future.result()
+            shards[shard_path] = (rows, nnz)
+            doc_freq[columns] += counts
+            n_rows += rows
+            n_nnz += nnz
+
+    try:
+        # Keep only a bounded number of chunks in flight
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            order = []
+            for i, rows in enumerate(iter_freelancer_chunks(db_path, chunk_size)):
+                shard_path = os.path.join(shard_dir, f"{i:08d}.npz")
+                order.append(shard_path)
+                pending.add(pool.submit(_vectorize_chunk, shard_path, rows))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            collect(wait(pending).done)
+
+        features = np.flatnonzero(doc_freq)
+        idf = (np.log((1 + n_rows) / (1 + doc_freq[features])) + 1).astype(np.float32)
+        _write_vocab(build_dir, features, idf, n_rows)
+        _merge_shards(build_dir, [(path, *shards[path]) for path in order], n_rows, n_nnz)
+        np.save(os.path.join(build_dir, 'max_profile_id.npy'), np.int64(max_profile_id))
+        shutil.rmtree(shard_dir)
+
+        final_dir = os.path.join(index_dir, generation)
+        os.replace(build_dir, final_dir)
+        _publish(index_dir, generation)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    _remove_stale_generations(index_dir, keep=generation)
+    return generation
+
+
+def _hash_slots(features: np.ndarray, size: int) -> np.ndarray:
+    # Fibonacci hashing of the hashed feature ids into a power-of-two table
+    shift = np.uint64(64 - (size.bit_length() - 1))
+    with np.errstate(over='ignore'):
+        return ((features.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) >> shift).astype(np.int64)
+
+
+def _build_vocab_table(features: np.ndarray):
+    """Build an open-addressing table mapping hashed feature ids to dense columns."""
+    size = 1 << max(1, (2 * len(features) - 1).bit_length())
+    keys = np.full(size, -1, dtype=np.int64)
+    columns = np.full(size, -1, dtype=np.int32)
+
+    slots = _hash_slots(features, size)
+    pending = np.arange(len(features))
+    while len(pending):
+        candidates = pending[keys[slots[pending]] == -1]
+        claimed, first = np.unique(slots[candidates], return_index=True)
+        winners = candidates[first]
+        keys[claimed] = features[winners]
+        columns[claimed] = winners
+        pending = np.setdiff1d(pending, winners, assume_unique=True)
+        slots[pending] = (slots[pending] + 1) & (size - 1)
+    return keys, columns
+
+
+def _lookup_columns(keys: np.ndarray, columns: np.ndarray, features: np.ndarray) -> np.ndarray:
+    """Map hashed feature ids to dense columns, -1 for terms outside the vocabulary."""
+    size = len(keys)
+    result = np.full(len(features), -1, dtype=np.int64)
+    slots = _hash_slots(features, size)
+    active = np.arange(len(features))
+    while len(active):
+        found = keys[slots[active]]
+        hit = found == features[active]
+        result[active[hit]] = columns[slots[active[hit]]]
+        active = active[~hit & (found != -1)]
+        slots[active] = (slots[active] + 1) & (size - 1)
+    return result
+
+
+def _write_vocab(build_dir: str, features: np.ndarray, idf: np.ndarray, n_rows: int):
+    keys, columns = _build_vocab_table(features)
+    np.save(os.path.join(build_dir, 'vocab_keys.npy'), keys)
+    np.save(os.path.join(build_dir, 'vocab_columns.npy'), columns)
+    np.save(os.path.join(build_dir, 'idf.npy'), idf)
+    # IDF of a term no indexed profile contains, used for query norms
+    np.save(os.path.join(build_dir, 'unseen_idf.npy'), np.float32(np.log(1 + n_rows) + 1))
+
+
+def _merge_shards(build_dir: str, shards: list, n_rows: int, n_nnz: int):
+    """Apply IDF weighting and concatenate shards into flat CSR arrays on disk."""
+    keys = np.load(os.path.join(build_dir, 'vocab_keys.npy'))
+    columns = np.load(os.path.join(build_dir, 'vocab_columns.npy'))
+    idf = np.load(os.path.join(build_dir, 'idf.npy'))
+    # scipy only wraps the mapped arrays without copying when both index arrays share a dtype
+    index_dtype = np.int32 if n_nnz < 2 ** 31 else np.int64
+
+    open_array = np.lib.format.open_memmap
+    data = open_array(os.path.join(build_dir, 'data.npy'), mode='w+', dtype=np.float32, shape=(n_nnz,))
+    indices = open_array(os.path.join(build_dir, 'indices.npy'), mode='w+', dtype=index_dtype, shape=(n_nnz,))
+    indptr = open_array(os.path.join(build_dir, 'indptr.npy'), mode='w+', dtype=index_dtype, shape=(n_rows + 1,))
+    ids = open_array(os.path.join(build_dir, 'ids.npy'), mode='w+', dtype=np.int64, shape=(n_rows,))
+
+    row = nnz = 0
+    indptr[0] = 0
+    for shard_path, rows, shard_nnz in shards:
+        matrix = sp.load_npz(shard_path).astype(np.float32)
+        # Dense columns follow feature order, so remapped rows stay sorted
+        matrix.indices = _lookup_columns(keys, columns, matrix.indices.astype(np.int64)).astype(index_dtype)
+        matrix.data *= idf[matrix.indices]
+        matrix = normalize(matrix, norm='l2', copy=False)
+        data[nnz:nnz + shard_nnz] = matrix.data
+        indices[nnz:nnz + shard_nnz] = matrix.indices
+        indptr[row + 1:row + rows + 1] = matrix.indptr[1:] + nnz
+        ids[row:row + rows] = np.load(shard_path + '.ids.npy')
+        row += rows
+        nnz += shard_nnz
+
+    for array in (data, indices, indptr, ids):
+        array.flush()
+    del data, indices, indptr, ids
+
+
+def _publish(index_dir: str, generation: str):
+    """Atomically point the CURRENT generation file at a finished snapshot."""
+    tmp_path = os.path.join(index_dir, f".{CURRENT_FILE}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(generation)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(index_dir, CURRENT_FILE))
+
+
+def _remove_stale_generations(index_dir: str, keep: str):
+    # Leave the previous generation in place for readers that opened it mid-swap
+    generations = sorted(name for name in os.listdir(index_dir) if name.startswith('gen-'))
+    for name in generations[:-2]:
+        if name != keep:
+            shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+
+
+def current_generation(index_dir: str):
+    """Return the published generation name, or None if no index exists."""
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+_loaded = {}
+
+
+def load_index(index_dir: str):
+    """Open the current index generation read-only, reusing it until CURRENT changes.
+
+    Arrays are memory-mapped rather than read, so opening is near-instant and
+    every worker process shares the same pages through the OS page cache.
+    """
+    generation = current_generation(index_dir)
+    if generation is None:
+        return None
+    cached = _loaded.get(index_dir)
+    if cached and cached['generation'] == generation:
+        return cached
+
+    gen_dir = os.path.join(index_dir, generation)
+
+    def open_array(name):
+        return np.load(os.path.join(gen_dir, f"{name}.npy"), mmap_mode='r')
+
+    ids = open_array('ids')
+    idf = open_array('idf')
+    matrix = sp.csr_matrix((open_array('data'), open_array('indices'), open_array('indptr')),
+                           shape=(len(ids), len(idf)), copy=False)
+    index = {
+        'generation': generation,
+        'matrix': matrix,
+        'ids': ids,
+        'idf': idf,
+        'unseen_idf': float(np.load(os.path.join(gen_dir, 'unseen_idf.npy'))),
+        'vocab_keys': open_array('vocab_keys'),
+        'vocab_columns': open_array('vocab_columns'),
+        'max_profile_id': _load_max_profile_id(gen_dir),
+    }
+    _loaded[index_dir] = index
+    return index
+
+
+def _load_max_profile_id(gen_dir: str) -> int:
+    try:
+        return int(np.load(os.path.join(gen_dir, 'max_profile_id.npy')))
+    except FileNotFoundError:
+        # Generations built before the watermark was stored: rescan every profile
+        return 0
+
+
+def _weigh(index, texts: list):
+    """Vectorize texts with TF-IDF weights, staying in the hashed feature space.
+
+    Terms outside the vocabulary get the IDF of a term no indexed profile
+    contains, so profiles added since the build can still match on them.
+    """
+    counts = _vectorizer().transform(texts).tocsr().astype(np.float32)
+    counts.sum_duplicates()
+    columns = _lookup_columns(index['vocab_keys'], index['vocab_columns'], counts.indices.astype(np.int64))
+    known = columns >= 0
+    counts.data[known] *= index['idf'][columns[known]]
+    counts.data[~known] *= index['unseen_idf']
+    return normalize(counts, norm='l2', copy=False), columns
+
+
+def _dense_query(index, weighted, columns) -> np.ndarray:
+    """Project a weighted query row onto the index's dense columns."""
+    query = np.zeros(len(index['idf']), dtype=np.float32)
+    # Terms outside the vocabulary cannot match an indexed row but still count towards the norm
+    known = columns >= 0
+    query[columns[known]] = weighted.data[known]
+    return query
+
+
+def _best_per_id(ids: np.ndarray, scores: np.ndarray):
+    """Keep the highest score of each id (a user may have several profiles)."""
+    order = np.lexsort((-scores, ids))
+    ids, scores = ids[order], scores[order]
+    _, first = np.unique(ids, return_index=True)
+    return ids[first], scores[first]
+
+
+def search(index_dir: str, db_path: str, text: str, limit: int = 50) -> list:
+    """Score freelancers against a query, returning the top (user_id, score) pairs best first.
+
+    Profiles added after the index was built are scored directly from the
+    database in the hashed feature space, including on terms the index has
+    never seen, so results are never staler than the last registration.
+    """
+    index = load_index(index_dir)
+    if index is None:
+        return None
+
+    hashed_query, columns = _weigh(index, [normalize_text(text)])
+    # Only rows that match at all are copied out of the mapped arrays
+    scores = index['matrix'] @ _dense_query(index, hashed_query, columns)
+    matched = np.flatnonzero(scores > 0)
+    ids, scores = [index['ids'][matched]], [scores[matched]]
+
+    hashed_query = hashed_query.T.tocsc()
+    for rows in iter_new_profiles(db_path, index['max_profile_id']):
+        tail, _ = _weigh(index, [profile_text(row[2], row[3], row[4]) for row in rows])
+        tail_scores = (tail @ hashed_query).toarray().ravel()
+        tail_matched = np.flatnonzero(tail_scores > 0)
+        ids.append(np.array([rows[i][0] for i in tail_matched], dtype=np.int64))
+        scores.append(tail_scores[tail_matched])
+
+    ids, scores = _best_per_id(np.concatenate(ids), np.concatenate(scores))
+    if limit and len(scores) > limit:
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        ids, scores = ids[top], scores[top]
+    order = np.argsort(-scores, kind='stable')
+    return [(int(user_id), float(score)) for user_id, score in zip(ids[order], scores[order])]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the freelancer matching index.")
+    parser.add_argument('--db', default='freelance_platform.db')
+    parser.add_argument('--index-dir', default='matching_index')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.time()
+    generation = rebuild_index(args.db, args.index_dir, args.chunk_size, args.workers)
+    print(f"Published {generation} in {time.time() - started:.1f}s")
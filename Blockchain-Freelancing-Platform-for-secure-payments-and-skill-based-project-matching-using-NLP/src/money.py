@@ -0,0 +1,122 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN, localcontext
+
+# Decimal places of each currency's smallest unit (wei for ETH)
+CURRENCY_DECIMALS = {'ETH': 18}
+DEFAULT_CURRENCY = 'ETH'
+
+# SQLite integers are 64-bit, which caps a wei column at ~9.22 ETH, so amounts
+# are stored as whole gwei plus the wei below one gwei. Both columns sum exactly.
+GWEI = 10 ** 9
+# Enough significant digits for any uint256 amount
+_PRECISION = 80
+
+
+def _decimals(currency: str) -> int:
+    try:
+        return CURRENCY_DECIMALS[currency]
+    except KeyError:
+        raise ValueError(f"Unsupported currency: {currency}")
+
+
+def to_wei(amount, currency: str = DEFAULT_CURRENCY) -> int:
+    """Convert a decimal amount (str, int, Decimal or float) to integer wei."""
+    # repr() is the shortest string that round-trips, so 0.1 becomes exactly 0.1 ETH
+    if isinstance(amount, float):
+        amount = repr(amount)
+    try:
+        with localcontext() as context:
+            context.prec = _PRECISION
+            value = Decimal(amount).scaleb(_decimals(currency))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {amount}")
+    if not value.is_finite() or value != value.to_integral_value():
+        raise ValueError(f"Amount {amount} is not a whole number of wei")
+    if value < 0:
+        raise ValueError("Amount cannot be negative")
+    return int(value)
+
+
+def from_wei(wei: int, currency: str = DEFAULT_CURRENCY) -> Decimal:
+    with localcontext() as context:
+        context.prec = _PRECISION
+        return Decimal(wei).scaleb(-_decimals(currency))
+
+
+def format_amount(wei: int, currency: str = DEFAULT_CURRENCY) -> str:
+    """Human-readable amount without float rounding, e.g. '1.5 ETH'."""
+    with localcontext() as context:
+        context.prec = _PRECISION
+        value = from_wei(wei, currency).normalize()
+    return f"{value:f} {currency}"
+
+
+def split_wei(wei: int) -> tuple:
+    """Split wei into (gwei, remainder) for the two integer storage columns."""
+    return divmod(int(wei), GWEI)
+
+
+def join_wei(gwei, remainder) -> int:
+    """Inverse of split_wei; also combines SUM() results of the two columns."""
+    return (gwei or 0) * GWEI + (remainder or 0)
+
+
+def _legacy_wei(value, in_wei: bool):
+    """Best integer wei reading of a stored legacy amount, and whether it had to be adjusted.
+
+    Sub-wei digits are rounded to the nearest wei; negative or unreadable
+    values become 0, so one bad row cannot block the migration.
+    """
+    try:
+        with localcontext() as context:
+            context.prec = _PRECISION
+            wei = Decimal(repr(value) if isinstance(value, float) else (value or 0))
+            if not in_wei:
+                wei = wei.scaleb(_decimals(DEFAULT_CURRENCY))
+            rounded = wei.to_integral_value(ROUND_HALF_EVEN)
+    except (InvalidOperation, TypeError, ValueError):
+        return 0, True
+    if not rounded.is_finite() or rounded < 0:
+        return 0, True
+    return int(rounded), rounded != wei
+
+
+def migrate_amount_column(conn, table: str, schema: str, real_column: str, prefix: str,
+                          in_wei: bool = False, with_currency: bool = True) -> int:
+    """Rebuild a table whose single amount column predates split wei storage.
+
+    The table is recreated from schema with <prefix>_gwei and
+    <prefix>_wei_remainder columns (plus currency unless with_currency is
+    False), every other column is copied as is, and the number of migrated
+    rows is returned (0 if already migrated). The old column holds ether,
+    or integer wei if in_wei is set. Rows that cannot be converted exactly
+    are rounded or zeroed as _legacy_wei describes and reported by rowid.
+    """
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if real_column not in columns:
+        return 0
+
+    kept = [column for column in columns if column != real_column]
+    new_columns = [f'{prefix}_gwei', f'{prefix}_wei_remainder'] + (['currency'] if with_currency else [])
+    conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        rows = conn.execute(f'SELECT rowid, {", ".join(kept)}, {real_column} FROM {table}').fetchall()
+        migrated = []
+        for rowid, *row, value in rows:
+            wei, adjusted = _legacy_wei(value, in_wei)
+            if adjusted:
+                print(f"{table} row {rowid}: {real_column} {value!r} stored as {wei} wei")
+            migrated.append((*row, *split_wei(wei), *([DEFAULT_CURRENCY] if with_currency else [])))
+
+        conn.execute(f'CREATE TABLE {table}_new {schema}')
+        placeholders = ', '.join('?' * (len(kept) + len(new_columns)))
+        conn.executemany(
+            f'INSERT INTO {table}_new ({", ".join(kept + new_columns)}) VALUES ({placeholders})', migrated)
+        # Drop-and-rename keeps foreign keys in other tables pointing at this name
+        conn.execute(f'DROP TABLE {table}')
+        conn.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return len(rows)
@@ -0,0 +1,845 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import secrets
+import argparse
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import money
+import matching_index
+import project_dedup
+from db_pool import ConnectionPool
+from tx_ledger import TxLedger
+from validation import hash_password, validate_registration
+
+DB_PATH = 'freelance_platform.db'
+# Built by `python matching_index.py`; matching falls back to a full scan without it
+INDEX_DIR = 'matching_index'
+PROVIDER_URL = 'HTTP://127.0.0.1:8545'
+# Freelancers returned per match query
+MATCH_LIMIT = 50
+# Seconds a login token stays valid
+SESSION_TTL = 12 * 60 * 60
+
+# Budgets are integer wei split over two columns, see money.py
+PROJECTS_SCHEMA = '''(id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                employer_id INTEGER,
+                freelancer_id INTEGER,
+                status TEXT DEFAULT 'open',
+                budget_gwei INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                contract_address TEXT,
+                budget_wei_remainder INTEGER NOT NULL DEFAULT 0,
+                currency TEXT NOT NULL DEFAULT 'ETH',
+                FOREIGN KEY (employer_id) REFERENCES users(id),
+                FOREIGN KEY (freelancer_id) REFERENCES users(id))'''
+
+# Project rows keep the original column order, with the budget in wei at index 6
+# and the currency appended at index 9
+_PROJECT_QUERY = '''SELECT id, title, description, employer_id, freelancer_id, status, budget_gwei,
+                created_at, contract_address, currency, budget_wei_remainder FROM projects'''
+
+
+class RequestError(Exception):
+    """Error reported to the client with an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# Database setup
+def init_db(db_path: str = DB_PATH):
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+
+    # Create users table
+    c.execute('''CREATE TABLE IF NOT EXISTS users
+                (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                user_type TEXT NOT NULL,
+                wallet_address TEXT,
+                private_key TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+    # Create freelancer_profiles table
+    c.execute('''CREATE TABLE IF NOT EXISTS freelancer_profiles
+                (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                skills TEXT NOT NULL,
+                experience INTEGER,
+                hourly_rate REAL,
+                bio TEXT,
+                FOREIGN KEY (user_id) REFERENCES users(id))''')
+
+    # Create projects table
+    c.execute(f'CREATE TABLE IF NOT EXISTS projects {PROJECTS_SCHEMA}')
+    # Databases created before wei storage still have a REAL ether budget column
+    money.migrate_amount_column(conn, 'projects', PROJECTS_SCHEMA, 'budget', 'budget')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_projects_status_employer ON projects (status, employer_id)')
+
+    # MinHash signatures and LSH buckets for near-duplicate detection
+    project_dedup.init_tables(conn)
+
+    # Login sessions; only a hash of each bearer token is stored
+    c.execute('''CREATE TABLE IF NOT EXISTS sessions
+                (token_hash TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                expires_at INTEGER NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id))''')
+
+    conn.commit()
+    conn.close()
+
+
+def _project_row(row):
+    return (*row[:6], money.join_wei(row[6], row[10]), *row[7:10])
+
+
+def _public_user(row):
+    # Password hash (3) and private key (6) are blanked so column positions stay those of users
+    return (*row[:3], None, *row[4:6], None, *row[7:])
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PlatformService:
+    """Projects, profiles, matching and escrow actions behind the HTTP API."""
+
+    def __init__(self, db_path: str = DB_PATH, provider_url: str = PROVIDER_URL, index_dir: str = INDEX_DIR):
+        # Imported here so forked workers each open their own node connection
+        from blockchain_interface import BlockchainInterface
+
+        init_db(db_path)
+        self.db_path = db_path
+        self.index_dir = index_dir
+        self.db_pool = ConnectionPool(db_path)
+        self.blockchain = BlockchainInterface(provider_url=provider_url, ledger=TxLedger(db_path))
+
+    def create_user(self, username, password, email, user_type, profile=None):
+        """Register a user with a new wallet; a freelancer profile dict is stored in the same transaction.
+
+        Applies the same rules as the registration form and the bulk importer,
+        so clients calling the API directly cannot skip them.
+        """
+        if user_type == 'freelancer' and not isinstance(profile, dict):
+            raise RequestError(400, "Freelancers must register with a profile!")
+        if not all(isinstance(value, str) for value in (username, password, email, user_type)):
+            raise RequestError(400, "username, password, email and user_type must be strings!")
+        skills = profile.get('skills') if user_type == 'freelancer' else None
+        if skills is not None and not isinstance(skills, str):
+            raise RequestError(400, "skills must be a string!")
+        error = validate_registration(username, email, password, user_type, skills)
+        if error:
+            raise RequestError(400, error)
+        if user_type == 'freelancer':
+            try:
+                int(profile.get('experience') or 0)
+                float(profile.get('hourly_rate') or 0)
+            except (TypeError, ValueError):
+                raise RequestError(400, "Experience and hourly rate must be numeric!")
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        try:
+            hashed_password = hash_password(password)
+            wallet_info = self.blockchain.create_wallet()
+            c.execute('''INSERT INTO users (username, password, email, user_type, wallet_address, private_key)
+                        VALUES (?, ?, ?, ?, ?, ?)''', (username, hashed_password, email, user_type, wallet_info['address'], wallet_info['private_key']))
+            user_id = c.lastrowid
+            if user_type == 'freelancer':
+                c.execute('''INSERT INTO freelancer_profiles (user_id, skills, experience, hourly_rate, bio)
+                            VALUES (?, ?, ?, ?, ?)''', (user_id, profile['skills'], profile.get('experience'),
+                                                        profile.get('hourly_rate'), profile.get('bio')))
+            conn.commit()
+            return user_id
+        except sqlite3.IntegrityError:
+            return None
+        finally:
+            conn.close()
+
+    def verify_user(self, email, password):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        hashed_password = hash_password(password)
+        c.execute('SELECT * FROM users WHERE email = ? AND password = ?', (email, hashed_password))
+        user = c.fetchone()
+        conn.close()
+        return user
+
+    def create_session(self, user_id) -> str:
+        """Issue a bearer token for a logged-in user."""
+        token = secrets.token_urlsafe(32)
+        now = int(time.time())
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('DELETE FROM sessions WHERE expires_at <= ?', (now,))
+        c.execute('INSERT INTO sessions (token_hash, user_id, expires_at) VALUES (?, ?, ?)',
+                  (_token_hash(token), user_id, now + SESSION_TTL))
+        conn.commit()
+        conn.close()
+        return token
+
+    def authenticate(self, token):
+        """Return the users row a bearer token belongs to."""
+        if not token:
+            raise RequestError(401, "Login required!")
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('''SELECT users.* FROM sessions JOIN users ON users.id = sessions.user_id
+                    WHERE sessions.token_hash = ? AND sessions.expires_at > ?''', (_token_hash(token), int(time.time())))
+        user = c.fetchone()
+        conn.close()
+        if not user:
+            raise RequestError(401, "Session expired, please log in again!")
+        return user
+
+    def delete_sessions(self, user_id):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('DELETE FROM sessions WHERE user_id = ?', (user_id,))
+        conn.commit()
+        conn.close()
+
+    def _get_user(self, user_id):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+        user = c.fetchone()
+        conn.close()
+        if not user:
+            raise RequestError(404, "User not found!")
+        return user
+
+    def create_freelancer_profile(self, user_id, skills, experience, hourly_rate, bio):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('''INSERT INTO freelancer_profiles (user_id, skills, experience, hourly_rate, bio)
+                    VALUES (?, ?, ?, ?, ?)''', (user_id, skills, experience, hourly_rate, bio))
+        conn.commit()
+        conn.close()
+
+    def get_freelancer_profile(self, user_id):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('SELECT * FROM freelancer_profiles WHERE user_id = ?', (user_id,))
+        profile = c.fetchone()
+        conn.close()
+        return profile
+
+    def create_project(self, title, description, employer_id, budget_wei, currency=money.DEFAULT_CURRENCY):
+        if currency not in money.CURRENCY_DECIMALS or not isinstance(budget_wei, int) or budget_wei <= 0:
+            raise RequestError(400, "Budget must be a positive whole number of wei in a supported currency!")
+        budget_gwei, budget_wei_remainder = money.split_wei(budget_wei)
+        signature = project_dedup.signature(description)
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('''INSERT INTO projects (title, description, employer_id, budget_gwei, budget_wei_remainder,
+        currency, contract_address) VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                  (title, description, employer_id, budget_gwei, budget_wei_remainder, currency, None))
+        project_id = c.lastrowid
+        project_dedup.index_project(conn, project_id, signature)
+        conn.commit()
+        conn.close()
+        return project_id
+
+    def find_similar_projects(self, description):
+        signature = project_dedup.signature(description)
+        conn = self.db_pool.connect()
+        similar = project_dedup.find_similar(conn, signature)
+        conn.close()
+        return similar
+
+    def get_project(self, project_id):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute(f'{_PROJECT_QUERY} WHERE id = ?', (project_id,))
+        project = c.fetchone()
+        conn.close()
+        return _project_row(project) if project else None
+
+    def get_projects(self, employer_id=None, freelancer_id=None, status='open'):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+
+        query = f"{_PROJECT_QUERY} WHERE status = ?"
+        params = [status]
+
+        if employer_id:
+            query += " AND employer_id = ?"
+            params.append(employer_id)
+        elif freelancer_id:
+            query += " AND freelancer_id = ?"
+            params.append(freelancer_id)
+
+        c.execute(query, params)
+        projects = [_project_row(row) for row in c.fetchall()]
+        conn.close()
+        return projects
+
+    def view_projects(self, employer_id=None, freelancer_id=None, available=False):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+
+        if employer_id:
+            # Show projects posted by this employer
+            c.execute(f'{_PROJECT_QUERY} WHERE employer_id = ?', (employer_id,))
+        elif freelancer_id and not available:
+            # Show only assigned projects for this freelancer
+            c.execute(f'{_PROJECT_QUERY} WHERE status = "assigned" AND freelancer_id = ?', (freelancer_id,))
+        elif available:
+            # Show only open projects (not assigned)
+            c.execute(f'{_PROJECT_QUERY} WHERE status = "open" AND freelancer_id IS NULL')
+        else:
+            # Default: Show open projects
+            c.execute(f'{_PROJECT_QUERY} WHERE status = "open"')
+
+        projects = [_project_row(row) for row in c.fetchall()]
+        conn.close()
+        return projects
+
+    def delete_project(self, project_id, employer_id):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('DELETE FROM projects WHERE id = ? AND employer_id = ?', (project_id, employer_id))
+        if c.rowcount:
+            project_dedup.remove_project(conn, project_id)
+        conn.commit()
+        conn.close()
+
+    def apply_to_project(self, project_id, freelancer_id):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('UPDATE projects SET freelancer_id = ?, status = ? WHERE id = ? AND status = ?',
+                  (freelancer_id, 'assigned', project_id, 'open'))
+        conn.commit()
+        conn.close()
+        if not c.rowcount:
+            raise RequestError(409, "Project is no longer open!")
+
+    def get_all_freelancers(self):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('''SELECT users.id, users.username, users.email, freelancer_profiles.skills,
+                    freelancer_profiles.experience, freelancer_profiles.hourly_rate,
+                    freelancer_profiles.bio, users.wallet_address
+                    FROM users
+                    JOIN freelancer_profiles ON users.id = freelancer_profiles.user_id
+                    WHERE users.user_type = 'freelancer'
+                    ''')
+        freelancers = c.fetchall()
+        conn.close()
+        return freelancers
+
+    def get_freelancers_by_ids(self, user_ids):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        freelancers = []
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(user_ids), 500):
+            batch = user_ids[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            c.execute(f'''SELECT users.id, users.username, users.email, freelancer_profiles.skills,
+                        freelancer_profiles.experience, freelancer_profiles.hourly_rate,
+                        freelancer_profiles.bio, users.wallet_address
+                        FROM users
+                        JOIN freelancer_profiles ON users.id = freelancer_profiles.user_id
+                        WHERE users.id IN ({placeholders})
+                        ''', batch)
+            freelancers.extend(c.fetchall())
+        conn.close()
+        return freelancers
+
+    def match_freelancers(self, project_description, required_skills):
+        matches = matching_index.search(self.index_dir, self.db_path, f"{project_description} {required_skills}",
+                                        limit=MATCH_LIMIT)
+        if matches is not None:
+            return self._match_freelancers_from_index(matches)
+
+        freelancers = self.get_all_freelancers()
+        if not freelancers:
+            return []
+
+        project_text = f"{project_description} {required_skills}"
+        texts = [project_text]
+        freelancer_data = []
+
+        for freelancer in freelancers:
+            freelancer_text = f"{freelancer[3] or ''} {freelancer[4] or ''} {freelancer[6] or ''}"
+            texts.append(freelancer_text)
+            freelancer_data.append({
+                'id': freelancer[0],
+                'username': freelancer[1],
+                'email': freelancer[2],
+                'skills': freelancer[3],
+                'experience': freelancer[4],
+                'hourly_rate': freelancer[5],
+                'bio': freelancer[6],
+                'wallet_address': freelancer[7]
+            })
+
+        vectorizer = TfidfVectorizer(stop_words='english')
+        tfidf_matrix = vectorizer.fit_transform(texts)
+        cosine_similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])
+
+        for idx, score in enumerate(cosine_similarities[0]):
+            freelancer_data[idx]['match_score'] = float(score)
+        matched_freelancers = [freelancer for freelancer in freelancer_data if freelancer['match_score'] > 0]
+
+        # Sort the freelancers by match score in descending order
+        matched_freelancers = sorted(matched_freelancers, key=lambda x: x['match_score'], reverse=True)
+
+        return matched_freelancers[:MATCH_LIMIT]
+
+    def _match_freelancers_from_index(self, matches):
+        if not matches:
+            return []
+
+        scores = dict(matches)
+        matched_freelancers = {}
+        for freelancer in self.get_freelancers_by_ids(list(scores)):
+            matched_freelancers.setdefault(freelancer[0], {
+                'id': freelancer[0],
+                'username': freelancer[1],
+                'email': freelancer[2],
+                'skills': freelancer[3],
+                'experience': freelancer[4],
+                'hourly_rate': freelancer[5],
+                'bio': freelancer[6],
+                'wallet_address': freelancer[7],
+                'match_score': scores[freelancer[0]]
+            })
+
+        return sorted(matched_freelancers.values(), key=lambda x: x['match_score'], reverse=True)
+
+    def hire_freelancer(self, project_id, employer_id, freelancer_id):
+        """Deploy the escrow contract for a project and assign the freelancer.
+
+        The project is first claimed by moving it from open to hiring, so a
+        repeated or concurrent hire cannot deploy a second contract.
+        """
+        employer = self._get_user(employer_id)
+        freelancer = self._get_user(freelancer_id)
+        if freelancer[4] != 'freelancer':
+            raise RequestError(400, "Only freelancers can be hired!")
+
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute('UPDATE projects SET status = ? WHERE id = ? AND employer_id = ? AND status = ?',
+                  ('hiring', project_id, employer_id, 'open'))
+        conn.commit()
+        conn.close()
+        project = self.get_project(project_id)
+        if not project or project[3] != employer_id:
+            raise RequestError(404, "Project not found!")
+        if not c.rowcount:
+            raise RequestError(409, "Project is no longer open!")
+
+        # No pooled connection is held while the deployment is mined
+        broadcast = []
+        try:
+            contract_address = self.blockchain.deploy_contract(
+                employer_private_key=employer[6],
+                freelancer_address=freelancer[5],
+                job_description=project[2],  # project description
+                amount_wei=project[6],  # project budget
+                on_broadcast=broadcast.append
+            )
+        except Exception as e:
+            if broadcast:
+                # The contract may still be mined, so the project stays claimed
+                print(f"Project {project_id} left in hiring: deployment {broadcast[0].hex()} not confirmed")
+                raise RequestError(504, f"Deployment {broadcast[0].hex()} was sent but not confirmed: {str(e)}")
+            self._set_status(project_id, 'hiring', 'open')
+            raise
+
+        conn = self.db_pool.connect()
+        try:
+            c = conn.cursor()
+            c.execute('''UPDATE projects
+                        SET freelancer_id = ?,
+                            status = ?,
+                            contract_address = ?
+                        WHERE id = ? AND status = ?''',
+                    (freelancer_id, 'assigned', contract_address, project_id, 'hiring'))
+            conn.commit()
+        finally:
+            conn.close()
+        return contract_address
+
+    def _set_status(self, project_id, old_status, new_status):
+        self._set_statuses([project_id], old_status, new_status)
+
+    def _set_statuses(self, project_ids, old_status, new_status):
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.executemany('UPDATE projects SET status = ? WHERE id = ? AND status = ?',
+                      [(new_status, pid, old_status) for pid in project_ids])
+        conn.commit()
+        conn.close()
+
+    def _run_escrow_batch(self, user_id, project_ids, owner_column, required_status, claim_status, new_status,
+                          action):
+        """Send one escrow action for a user's projects in a single signed batch.
+
+        Eligible projects are first claimed by moving them to claim_status, so a
+        repeated or concurrent request cannot send the same transaction twice.
+        Projects whose transaction was never sent or reverted are moved back.
+        """
+        user = self._get_user(user_id)
+        placeholders = ','.join('?' * len(project_ids))
+        conn = self.db_pool.connect()
+        try:
+            c = conn.cursor()
+            c.execute('BEGIN IMMEDIATE')
+            c.execute(f'''SELECT id, contract_address FROM projects
+                        WHERE id IN ({placeholders}) AND {owner_column} = ? AND status = ?
+                        AND contract_address IS NOT NULL''', (*project_ids, user_id, required_status))
+            claimed = c.fetchall()
+            c.executemany('UPDATE projects SET status = ? WHERE id = ?', [(claim_status, row[0]) for row in claimed])
+            conn.commit()
+        finally:
+            conn.close()
+        if not claimed:
+            return {'succeeded': [], 'pending': [], 'failed': list(project_ids)}
+
+        # One signed batch, so all transactions land in about one block
+        broadcast = set()
+        try:
+            receipts = action([row[1] for row in claimed], user[6],
+                              on_broadcast=lambda offset, tx_hash: broadcast.add(offset))
+        except Exception:
+            # Raised before anything was sent (nonce, gas price or signing)
+            self._set_statuses([row[0] for row in claimed], claim_status, required_status)
+            raise
+        succeeded = [row[0] for row, receipt in zip(claimed, receipts) if receipt is not None and receipt.status == 1]
+        # Sent but without a receipt yet: may still be mined, so they stay claimed and are not reported as failed
+        pending = [row[0] for offset, (row, receipt) in enumerate(zip(claimed, receipts))
+                   if receipt is None and offset in broadcast]
+        for pid in pending:
+            print(f"Project {pid} left in {claim_status}: transaction sent but not confirmed")
+
+        self._set_statuses(succeeded, claim_status, new_status)
+        self._set_statuses([row[0] for row in claimed if row[0] not in succeeded and row[0] not in pending],
+                           claim_status, required_status)
+        return {'succeeded': succeeded, 'pending': pending,
+                'failed': [pid for pid in project_ids if pid not in succeeded and pid not in pending]}
+
+    def complete_works(self, project_ids, freelancer_id):
+        return self._run_escrow_batch(freelancer_id, project_ids, 'freelancer_id', 'assigned', 'completing',
+                                      'completed', self.blockchain.complete_works)
+
+    def release_payments(self, project_ids, employer_id):
+        return self._run_escrow_batch(employer_id, project_ids, 'employer_id', 'completed', 'releasing', 'paid',
+                                      self.blockchain.release_payments)
+
+    def _amount_totals(self, group_column, statuses, group_id=None):
+        # Exact integer SUM()s in SQLite; only one join per group happens in Python
+        placeholders = ','.join('?' * len(statuses))
+        query = f'''SELECT {group_column}, currency, COUNT(*), SUM(budget_gwei), SUM(budget_wei_remainder)
+                    FROM projects WHERE status IN ({placeholders})'''
+        params = list(statuses)
+        if group_id:
+            query += f' AND {group_column} = ?'
+            params.append(group_id)
+        query += f' GROUP BY {group_column}, currency'
+
+        conn = self.db_pool.connect()
+        c = conn.cursor()
+        c.execute(query, params)
+        totals = [{
+            group_column: row[0],
+            'currency': row[1],
+            'projects': row[2],
+            'amount_wei': money.join_wei(row[3], row[4])
+        } for row in c.fetchall()]
+        conn.close()
+        return totals
+
+    def escrow_totals(self, employer_id=None):
+        """Budget locked in escrow contracts (hired but not yet paid out), per employer."""
+        return self._amount_totals('employer_id', ('assigned', 'completing', 'completed', 'releasing'), employer_id)
+
+    def payout_totals(self, freelancer_id=None):
+        """Budget released to freelancers, per freelancer."""
+        return self._amount_totals('freelancer_id', ('paid',), freelancer_id)
+
+    def get_balance(self, wallet_address):
+        checksum_address = self.blockchain.w3.to_checksum_address(wallet_address)
+        return self.blockchain.w3.eth.get_balance(checksum_address)
+
+
+# HTTP API
+ROUTES = []
+
+
+def route(method, pattern, public=False):
+    """Register a handler called as handler(service, user, body, query, *groups).
+
+    user is the users row of the request's bearer token; public routes get None.
+    """
+    def register(handler):
+        ROUTES.append((method, re.compile(pattern + '$'), handler, public))
+        return handler
+    return register
+
+
+def _int_or_none(value):
+    return int(value) if value not in (None, '') else None
+
+
+def _require_type(user, user_type):
+    if user[4] != user_type:
+        raise RequestError(403, f"Only {user_type}s can do this!")
+
+
+def _own_filter(user, value):
+    # Project lists may only be filtered on the caller's own id
+    user_id = _int_or_none(value)
+    if user_id is not None and user_id != user[0]:
+        raise RequestError(403, "You can only list your own projects!")
+    return user_id
+
+
+@route('POST', r'/users', public=True)
+def _create_user(service, user, body, query):
+    user_id = service.create_user(body['username'], body['password'], body['email'], body['user_type'],
+                                  body.get('profile'))
+    if not user_id:
+        raise RequestError(409, "Username or email already exists!")
+    return {'id': user_id}
+
+
+@route('POST', r'/login', public=True)
+def _login(service, user, body, query):
+    user = service.verify_user(body['email'], body['password'])
+    if not user:
+        raise RequestError(401, "Invalid credentials!")
+    return {'token': service.create_session(user[0]), 'user': _public_user(user)}
+
+
+@route('POST', r'/logout')
+def _logout(service, user, body, query):
+    # Ends every session of the user, not only the one making the request
+    service.delete_sessions(user[0])
+    return {}
+
+
+@route('GET', r'/me/wallet')
+def _wallet(service, user, body, query):
+    return {'address': user[5], 'private_key': user[6]}
+
+
+@route('POST', r'/profiles')
+def _create_profile(service, user, body, query):
+    _require_type(user, 'freelancer')
+    service.create_freelancer_profile(user[0], body['skills'], body['experience'],
+                                      body['hourly_rate'], body['bio'])
+    return {}
+
+
+@route('GET', r'/profiles/(\d+)')
+def _get_profile(service, user, body, query, user_id):
+    return service.get_freelancer_profile(int(user_id))
+
+
+@route('POST', r'/projects')
+def _create_project(service, user, body, query):
+    _require_type(user, 'employer')
+    return {'id': service.create_project(body['title'], body['description'], user[0], body['budget_wei'],
+                                         body.get('currency', money.DEFAULT_CURRENCY))}
+
+
+@route('POST', r'/projects/similar')
+def _similar_projects(service, user, body, query):
+    return service.find_similar_projects(body['description'])
+
+
+@route('GET', r'/projects')
+def _get_projects(service, user, body, query):
+    return service.get_projects(_own_filter(user, query.get('employer_id')),
+                                _own_filter(user, query.get('freelancer_id')), query.get('status', 'open'))
+
+
+@route('GET', r'/projects/view')
+def _view_projects(service, user, body, query):
+    return service.view_projects(_own_filter(user, query.get('employer_id')),
+                                 _own_filter(user, query.get('freelancer_id')), query.get('available') == 'true')
+
+
+@route('GET', r'/projects/(\d+)')
+def _get_project(service, user, body, query, project_id):
+    project = service.get_project(int(project_id))
+    if not project:
+        raise RequestError(404, "Project not found!")
+    return project
+
+
+@route('DELETE', r'/projects/(\d+)')
+def _delete_project(service, user, body, query, project_id):
+    service.delete_project(int(project_id), user[0])
+    return {}
+
+
+@route('POST', r'/projects/(\d+)/apply')
+def _apply(service, user, body, query, project_id):
+    _require_type(user, 'freelancer')
+    service.apply_to_project(int(project_id), user[0])
+    return {}
+
+
+@route('POST', r'/projects/(\d+)/hire')
+def _hire(service, user, body, query, project_id):
+    _require_type(user, 'employer')
+    return {'contract_address': service.hire_freelancer(int(project_id), user[0], body['freelancer_id'])}
+
+
+@route('POST', r'/match')
+def _match(service, user, body, query):
+    return service.match_freelancers(body['description'], body['skills'])
+
+
+@route('POST', r'/escrow/complete')
+def _complete(service, user, body, query):
+    _require_type(user, 'freelancer')
+    return service.complete_works(body['project_ids'], user[0])
+
+
+@route('POST', r'/escrow/release')
+def _release(service, user, body, query):
+    _require_type(user, 'employer')
+    return service.release_payments(body['project_ids'], user[0])
+
+
+@route('GET', r'/reports/escrow')
+def _escrow_totals(service, user, body, query):
+    return service.escrow_totals(user[0])
+
+
+@route('GET', r'/reports/payouts')
+def _payout_totals(service, user, body, query):
+    return service.payout_totals(user[0])
+
+
+@route('GET', r'/wallets/(0x[0-9a-fA-F]{40})/balance')
+def _balance(service, user, body, query, wallet_address):
+    return {'balance_wei': service.get_balance(wallet_address)}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients reuse pooled connections
+    protocol_version = 'HTTP/1.1'
+    service = None
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _token(self):
+        scheme, _, token = (self.headers.get('Authorization') or '').partition(' ')
+        return token.strip() if scheme.lower() == 'bearer' else None
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+
+        status, payload = 404, {'error': "Not found"}
+        for route_method, pattern, handler, public in ROUTES:
+            match = pattern.match(url.path)
+            if not match or route_method != method:
+                continue
+            try:
+                body = json.loads(self.rfile.read(length)) if length else {}
+                user = None if public else self.service.authenticate(self._token())
+                status, payload = 200, handler(self.service, user, body, query, *match.groups())
+            except RequestError as e:
+                status, payload = e.status, {'error': str(e)}
+            except (KeyError, ValueError, TypeError) as e:
+                status, payload = 400, {'error': f"Bad request: {str(e)}"}
+            except Exception as e:
+                status, payload = 500, {'error': str(e)}
+            break
+        else:
+            self.rfile.read(length)
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _run_worker(server, db_path, provider_url, index_dir):
+    ServiceHandler.service = PlatformService(db_path, provider_url, index_dir)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(host='127.0.0.1', port=8600, workers=None, db_path=DB_PATH, provider_url=PROVIDER_URL,
+          index_dir=INDEX_DIR):
+    """Serve the API from several worker processes sharing one listening socket.
+
+    The matching index is memory-mapped, so workers share its pages; each
+    worker has its own SQLite pool and node connection.
+    """
+    workers = workers or os.cpu_count() or 1
+    init_db(db_path)
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+
+    if workers == 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        _run_worker(server, db_path, provider_url, index_dir)
+        return
+
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_run_worker, args=(server, db_path, provider_url, index_dir), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Matching and escrow service for the freelancing platform.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--provider-url', default=PROVIDER_URL)
+    parser.add_argument('--index-dir', default=INDEX_DIR)
+    args = parser.parse_args()
+
+    print(f"Serving on http://{args.host}:{args.port}")
+    serve(args.host, args.port, args.workers, args.db, args.provider_url, args.index_dir)
@@ -0,0 +1,144 @@
+import re
+import zlib
+import sqlite3
+import hashlib
+import argparse
+
+import numpy as np
+
+from matching_index import normalize_text
+
+# 128 permutations split into 32 bands of 4 rows: pairs above ~0.42 Jaccard
+# usually share a bucket, and candidates are then checked on the full signature
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DUPLICATE_THRESHOLD = 0.7
+
+# Universal hashing h(x) = (a * x + b) mod p over 32-bit shingle hashes
+_PRIME = (1 << 32) + 15
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def init_tables(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS project_signatures
+                (project_id INTEGER PRIMARY KEY,
+                signature BLOB NOT NULL,
+                FOREIGN KEY (project_id) REFERENCES projects(id))''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS project_lsh_buckets
+                (band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                project_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, project_id)) WITHOUT ROWID''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_project_lsh_project ON project_lsh_buckets (project_id)')
+
+
+def shingles(text: str) -> set:
+    """Character 5-gram shingles of a description, ignoring case and punctuation."""
+    # Character shingles survive small rewordings that break word n-grams
+    text = ' '.join(re.findall(r'\w+', normalize_text(text or '')))
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature of a description as NUM_PERM uint32 values."""
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles(text)), dtype=np.uint64)
+    if not hashes.size:
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    # (NUM_PERM, shingles) stays under 2**64 since a, x < 2**32
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % np.uint64(_PRIME)
+    return (permuted.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def band_buckets(sig: np.ndarray) -> list:
+    """(band, bucket) keys for a signature, one per band."""
+    buckets = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'little', signed=True)))
+    return buckets
+
+
+def index_projects(conn, signatures: list):
+    """Store (project_id, signature) pairs and their LSH buckets; the caller commits."""
+    project_ids = [(project_id,) for project_id, _ in signatures]
+    conn.executemany('DELETE FROM project_lsh_buckets WHERE project_id = ?', project_ids)
+    conn.executemany('INSERT OR REPLACE INTO project_signatures (project_id, signature) VALUES (?, ?)',
+                     [(project_id, sig.tobytes()) for project_id, sig in signatures])
+    conn.executemany('INSERT INTO project_lsh_buckets (band, bucket, project_id) VALUES (?, ?, ?)',
+                     [(band, bucket, project_id) for project_id, sig in signatures
+                      for band, bucket in band_buckets(sig)])
+
+
+def index_project(conn, project_id: int, sig: np.ndarray):
+    index_projects(conn, [(project_id, sig)])
+
+
+def remove_project(conn, project_id: int):
+    conn.execute('DELETE FROM project_signatures WHERE project_id = ?', (project_id,))
+    conn.execute('DELETE FROM project_lsh_buckets WHERE project_id = ?', (project_id,))
+
+
+def find_similar(conn, sig: np.ndarray, threshold: float = DUPLICATE_THRESHOLD, limit: int = 5) -> list:
+    """Return open projects whose estimated Jaccard similarity to sig is at least threshold.
+
+    Only projects sharing an LSH bucket are compared, so the cost depends on
+    the number of candidates rather than on the number of projects.
+    """
+    buckets = band_buckets(sig)
+    matches = ' OR '.join(['(b.band = ? AND b.bucket = ?)'] * len(buckets))
+    c = conn.cursor()
+    c.execute(f'''SELECT DISTINCT projects.id, projects.title, projects.employer_id, s.signature
+                FROM project_lsh_buckets b
+                JOIN projects ON projects.id = b.project_id
+                JOIN project_signatures s ON s.project_id = b.project_id
+                WHERE ({matches}) AND projects.status = 'open' ''',
+              [value for bucket in buckets for value in bucket])
+
+    similar = []
+    for project_id, title, employer_id, candidate in c.fetchall():
+        similarity = float(np.mean(np.frombuffer(candidate, dtype=np.uint32) == sig))
+        if similarity >= threshold:
+            similar.append({'id': project_id, 'title': title, 'employer_id': employer_id, 'similarity': similarity})
+    return sorted(similar, key=lambda x: x['similarity'], reverse=True)[:limit]
+
+
+def backfill(db_path: str, batch_size: int = 1000) -> int:
+    """Compute signatures for projects that have none, returning how many were added."""
+    conn = sqlite3.connect(db_path)
+    init_tables(conn)
+    c = conn.cursor()
+    added = 0
+    last_id = 0
+    try:
+        while True:
+            c.execute('''SELECT projects.id, projects.description FROM projects
+                        LEFT JOIN project_signatures s ON s.project_id = projects.id
+                        WHERE s.project_id IS NULL AND projects.id > ?
+                        ORDER BY projects.id LIMIT ?''', (last_id, batch_size))
+            rows = c.fetchall()
+            if not rows:
+                break
+            index_projects(conn, [(project_id, signature(description)) for project_id, description in rows])
+            conn.commit()
+            added += len(rows)
+            last_id = rows[-1][0]
+    finally:
+        conn.close()
+    return added
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Near-duplicate detection for project descriptions.")
+    parser.add_argument('--db', default='freelance_platform.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+    backfill_parser = commands.add_parser('backfill', help="Index existing projects that have no signature")
+    backfill_parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"Indexed {backfill(args.db, args.batch_size)} projects")
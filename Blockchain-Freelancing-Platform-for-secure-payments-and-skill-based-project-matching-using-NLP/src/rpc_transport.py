@@ -0,0 +1,155 @@
+import json
+import time
+import random
+import threading
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+# Reads that can be retried safely and shared between identical concurrent callers
+IDEMPOTENT_METHODS = {
+    'eth_blockNumber', 'eth_gasPrice', 'eth_chainId', 'net_version', 'eth_getBalance',
+    'eth_getTransactionCount', 'eth_getCode', 'eth_call', 'eth_estimateGas',
+    'eth_getTransactionReceipt', 'eth_getTransactionByHash', 'eth_getBlockByNumber',
+    'eth_getBlockByHash', 'eth_accounts', 'eth_maxPriorityFeePerGas', 'eth_feeHistory',
+}
+
+DEFAULT_TIMEOUT = 10
+METHOD_TIMEOUTS = {
+    'eth_blockNumber': 3,
+    'eth_gasPrice': 3,
+    'eth_chainId': 3,
+    'eth_getBalance': 5,
+    'eth_getTransactionCount': 5,
+    'eth_getTransactionReceipt': 5,
+    'eth_call': 15,
+    'eth_estimateGas': 15,
+    'eth_sendRawTransaction': 30,
+}
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without contacting the node while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fails fast after repeated transport failures, then lets one trial request through."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError("Ethereum node is unavailable, failing fast")
+            # Half-open: this caller probes the node
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider over a keep-alive connection pool with timeouts, retries,
+    coalescing of identical in-flight reads and a circuit breaker."""
+
+    # Retries are handled here instead of by web3's retry middleware
+    _middlewares = ()
+
+    def __init__(self, endpoint_uri: str, pool_size: int = 32, max_retries: int = 3,
+                 backoff: float = 0.1, breaker: CircuitBreaker = None):
+        super().__init__(endpoint_uri)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def make_request(self, method, params):
+        if method not in IDEMPOTENT_METHODS:
+            return self._post(method, params)
+
+        key = (method, json.dumps(params, sort_keys=True, default=str))
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(self._post_with_retries(method, params))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def _post_with_retries(self, method, params):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._post(method, params)
+            except requests.RequestException as e:
+                client_error = e.response is not None and e.response.status_code < 500
+                if client_error or attempt == self.max_retries:
+                    raise
+                # Exponential backoff with full jitter
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def _post(self, method, params):
+        self.breaker.before_request()
+        try:
+            response = self.session.post(
+                self.endpoint_uri,
+                data=self.encode_rpc_request(method, params),
+                headers=self.get_request_headers(),
+                timeout=METHOD_TIMEOUTS.get(method, DEFAULT_TIMEOUT),
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            # Client errors say nothing about node health
+            if e.response is not None and e.response.status_code < 500:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return self.decode_rpc_response(response.content)
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(endpoint_uri: str = 'HTTP://127.0.0.1:8545') -> PooledHTTPProvider:
+    """Return the process-wide provider for an endpoint, creating it on first use."""
+    with _providers_lock:
+        provider = _providers.get(endpoint_uri.lower())
+        if provider is None:
+            provider = _providers[endpoint_uri.lower()] = PooledHTTPProvider(endpoint_uri)
+        return provider
@@ -0,0 +1,152 @@
+import copy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Escrow calls return once their transactions are mined
+ESCROW_TIMEOUT = 300
+DEFAULT_TIMEOUT = 30
+
+
+class ServiceError(Exception):
+    """Error returned by the platform service."""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class PlatformClient:
+    """Client for the platform service (see platform_service.py).
+
+    Rows come back as lists in table column order, so callers index them
+    the same way as sqlite3 rows. Apart from registration and login, calls
+    act as the user whose token was passed to with_token().
+    """
+
+    def __init__(self, base_url: str = 'http://127.0.0.1:8600', pool_size: int = 16):
+        self.base_url = base_url.rstrip('/')
+        self.token = None
+        self.on_unauthorized = None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def with_token(self, token, on_unauthorized=None):
+        """Client for one logged-in user that shares this client's connection pool.
+
+        on_unauthorized is called before ServiceError is raised when the service
+        rejects the token (logged out elsewhere or expired).
+        """
+        client = copy.copy(self)
+        client.token = token
+        client.on_unauthorized = on_unauthorized
+        return client
+
+    def _request(self, method, path, timeout=DEFAULT_TIMEOUT, **kwargs):
+        if self.token:
+            kwargs['headers'] = {'Authorization': f"Bearer {self.token}"}
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            raise ServiceError(f"Platform service unavailable: {str(e)}") from e
+        payload = response.json()
+        if response.status_code == 401 and self.token and self.on_unauthorized:
+            self.on_unauthorized()
+        if response.status_code >= 400:
+            raise ServiceError(payload.get('error', response.reason), response.status_code)
+        return payload
+
+    def create_user(self, username, password, email, user_type, profile=None):
+        """Register a user; freelancers pass their profile as a dict of skills, experience, hourly_rate and bio."""
+        try:
+            return self._request('POST', '/users', json={
+                'username': username, 'password': password, 'email': email, 'user_type': user_type,
+                'profile': profile})['id']
+        except ServiceError as e:
+            if e.status == 409:
+                return None
+            raise
+
+    def login(self, email, password):
+        """Return {'token': ..., 'user': row} (without password or private key), or None."""
+        try:
+            return self._request('POST', '/login', json={'email': email, 'password': password})
+        except ServiceError as e:
+            if e.status == 401:
+                return None
+            raise
+
+    def logout(self):
+        self._request('POST', '/logout')
+
+    def get_wallet(self):
+        """Address and private key of the logged-in user's wallet."""
+        return self._request('GET', '/me/wallet')
+
+    def create_freelancer_profile(self, skills, experience, hourly_rate, bio):
+        self._request('POST', '/profiles', json={
+            'skills': skills, 'experience': experience, 'hourly_rate': hourly_rate, 'bio': bio})
+
+    def get_freelancer_profile(self, user_id):
+        return self._request('GET', f'/profiles/{user_id}')
+
+    def create_project(self, title, description, budget_wei, currency='ETH'):
+        return self._request('POST', '/projects', json={
+            'title': title, 'description': description, 'budget_wei': budget_wei, 'currency': currency})['id']
+
+    def find_similar_projects(self, description):
+        """Open projects whose description is a near-duplicate of this one."""
+        return self._request('POST', '/projects/similar', json={'description': description})
+
+    def get_project(self, project_id):
+        try:
+            return self._request('GET', f'/projects/{project_id}')
+        except ServiceError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def get_projects(self, employer_id=None, freelancer_id=None, status='open'):
+        """Projects by status; employer_id and freelancer_id may only be the logged-in user's id."""
+        return self._request('GET', '/projects', params={
+            'employer_id': employer_id, 'freelancer_id': freelancer_id, 'status': status})
+
+    def view_projects(self, employer_id=None, freelancer_id=None, available=False):
+        return self._request('GET', '/projects/view', params={
+            'employer_id': employer_id, 'freelancer_id': freelancer_id, 'available': 'true' if available else None})
+
+    def delete_project(self, project_id):
+        self._request('DELETE', f'/projects/{project_id}')
+
+    def apply_to_project(self, project_id):
+        self._request('POST', f'/projects/{project_id}/apply')
+
+    def match_freelancers(self, project_description, required_skills):
+        return self._request('POST', '/match', json={'description': project_description, 'skills': required_skills})
+
+    def hire_freelancer(self, project_id, freelancer_id):
+        return self._request('POST', f'/projects/{project_id}/hire', timeout=ESCROW_TIMEOUT, json={
+            'freelancer_id': freelancer_id})['contract_address']
+
+    def complete_works(self, project_ids):
+        """Mark projects completed in one batch, returning {'succeeded', 'pending', 'failed'} id lists."""
+        return self._request('POST', '/escrow/complete', timeout=ESCROW_TIMEOUT, json={
+            'project_ids': list(project_ids)})
+
+    def release_payments(self, project_ids):
+        """Release escrowed payments in one batch, returning {'succeeded', 'pending', 'failed'} id lists."""
+        return self._request('POST', '/escrow/release', timeout=ESCROW_TIMEOUT, json={
+            'project_ids': list(project_ids)})
+
+    def escrow_totals(self):
+        """Budget the logged-in employer holds in escrow, as exact 'amount_wei' integers."""
+        return self._request('GET', '/reports/escrow')
+
+    def payout_totals(self):
+        """Budget released to the logged-in freelancer, as exact 'amount_wei' integers."""
+        return self._request('GET', '/reports/payouts')
+
+    def get_balance(self, wallet_address):
+        return self._request('GET', f'/wallets/{wallet_address}/balance')['balance_wei']
@@ -0,0 +1,134 @@
+import sqlite3
+import argparse
+
+import money
+
+PERCENTILES = (50, 90, 99)
+
+# Fees are split like other amounts (see money.py) so sums cannot overflow.
+# effective_gas_price stays one column: it is per unit of gas, and a price
+# near the 64-bit limit (~9.2 ETH per gas) is far outside any real network.
+TX_LEDGER_SCHEMA = '''(id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project_id INTEGER,
+                    contract_address TEXT,
+                    action TEXT NOT NULL,
+                    tx_hash TEXT NOT NULL,
+                    status INTEGER,
+                    gas_used INTEGER,
+                    effective_gas_price INTEGER,
+                    fee_gwei INTEGER,
+                    fee_wei_remainder INTEGER,
+                    latency_ms INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (project_id) REFERENCES projects(id))'''
+
+
+class TxLedger:
+    """Records gas and latency for every escrow transaction in SQLite."""
+
+    def __init__(self, db_path: str = 'freelance_platform.db'):
+        self.db_path = db_path
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(f'CREATE TABLE IF NOT EXISTS tx_ledger {TX_LEDGER_SCHEMA}')
+        # Ledgers created before the split store the fee in one integer wei column
+        money.migrate_amount_column(conn, 'tx_ledger', TX_LEDGER_SCHEMA, 'fee_wei', 'fee',
+                                    in_wei=True, with_currency=False)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_tx_ledger_action ON tx_ledger (action)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_tx_ledger_contract ON tx_ledger (contract_address)')
+        conn.commit()
+        conn.close()
+
+    def record(self, action: str, receipt, gas_price: int, latency_seconds: float, contract_address: str = None):
+        """Store one mined transaction; the project is resolved from its contract address."""
+        contract_address = contract_address or receipt.get('contractAddress')
+        # Pre-London nodes omit effectiveGasPrice, so fall back to the price we signed with
+        effective_gas_price = receipt.get('effectiveGasPrice') or gas_price
+        fee_gwei, fee_wei_remainder = money.split_wei(receipt['gasUsed'] * effective_gas_price)
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''INSERT INTO tx_ledger (project_id, contract_address, action, tx_hash, status,
+                    gas_used, effective_gas_price, fee_gwei, fee_wei_remainder, latency_ms)
+                    VALUES ((SELECT id FROM projects WHERE contract_address = ?), ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                  (contract_address, contract_address, action, receipt['transactionHash'].hex(), receipt['status'],
+                   receipt['gasUsed'], effective_gas_price, fee_gwei, fee_wei_remainder,
+                   int(latency_seconds * 1000)))
+        conn.commit()
+        conn.close()
+
+    def action_percentiles(self) -> dict:
+        """Return gas, fee and latency percentiles per action."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT action, gas_used, fee_gwei, fee_wei_remainder, latency_ms FROM tx_ledger ORDER BY action')
+        samples = {}
+        for action, gas_used, fee_gwei, fee_wei_remainder, latency_ms in c:
+            values = samples.setdefault(action, {'gas_used': [], 'fee_wei': [], 'latency_ms': []})
+            values['gas_used'].append(gas_used)
+            values['fee_wei'].append(money.join_wei(fee_gwei, fee_wei_remainder))
+            values['latency_ms'].append(latency_ms)
+        conn.close()
+
+        report = {}
+        for action, values in samples.items():
+            report[action] = {'count': len(values['gas_used'])}
+            for metric, metric_values in values.items():
+                metric_values.sort()
+                for p in PERCENTILES:
+                    report[action][f"{metric}_p{p}"] = _nearest_rank(metric_values, p)
+        return report
+
+    def project_totals(self, employer_id: int = None) -> list:
+        """Return per-project transaction count, gas and fee totals, costliest first."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        # Deployments are recorded before the project row stores its contract address
+        query = '''SELECT projects.id, projects.title, COUNT(*), SUM(tx_ledger.gas_used),
+                    SUM(tx_ledger.fee_gwei), SUM(tx_ledger.fee_wei_remainder), AVG(tx_ledger.latency_ms)
+                    FROM tx_ledger
+                    JOIN projects ON projects.id = COALESCE(tx_ledger.project_id,
+                        (SELECT id FROM projects WHERE contract_address = tx_ledger.contract_address))'''
+        params = []
+        if employer_id:
+            query += ' WHERE projects.employer_id = ?'
+            params.append(employer_id)
+        query += ' GROUP BY projects.id'
+        c.execute(query, params)
+        totals = [{
+            'project_id': row[0],
+            'title': row[1],
+            'transactions': row[2],
+            'gas_used': row[3],
+            'fee_wei': money.join_wei(row[4], row[5]),
+            'avg_latency_ms': row[6]
+        } for row in c.fetchall()]
+        conn.close()
+        # Sorted after joining, since neither column alone orders the fees
+        return sorted(totals, key=lambda x: x['fee_wei'], reverse=True)
+
+
+def _nearest_rank(sorted_values: list, percentile: int):
+    if not sorted_values:
+        return None
+    rank = max(1, -(-percentile * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report escrow transaction costs.")
+    parser.add_argument('--db', default='freelance_platform.db')
+    parser.add_argument('--employer-id', type=int, default=None)
+    args = parser.parse_args()
+
+    ledger = TxLedger(args.db)
+    print("Per-action percentiles")
+    for action, stats in ledger.action_percentiles().items():
+        print(f"  {action} ({stats['count']} txs)")
+        for metric in ('gas_used', 'fee_wei', 'latency_ms'):
+            values = ', '.join(f"p{p}={stats[f'{metric}_p{p}']}" for p in PERCENTILES)
+            print(f"    {metric}: {values}")
+
+    print("Per-project totals")
+    for project in ledger.project_totals(args.employer_id):
+        print(f"  #{project['project_id']} {project['title']}: {project['transactions']} txs, "
+              f"{project['gas_used']} gas, {money.format_amount(project['fee_wei'])}, "
+              f"avg {project['avg_latency_ms']:.0f} ms")
@@ -0,0 +1,39 @@
+import re
+import hashlib
+
+USER_TYPES = ('employer', 'freelancer')
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def is_valid_username(username):
+    # Check if the username is alphanumeric and does not contain spaces
+    return bool(re.match("^[a-zA-Z0-9_]*$", username))
+
+# Function to validate email
+def is_valid_email(email):
+    # Basic email pattern check
+    email_regex = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
+    return bool(re.match(email_regex, email))
+
+# Function to validate password
+def is_valid_password(password):
+    # Password must contain at least 8 characters, 1 uppercase, 1 lowercase, 1 digit, and 1 special character
+    password_regex = r"^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$"
+    return bool(re.match(password_regex, password))
+
+def validate_registration(username, email, password, user_type, skills=None):
+    # Shared by the /users endpoint and the bulk importer; returns an error message or None
+    if not username:
+        return "Username cannot be empty!"
+    if not is_valid_username(username):
+        return "Username must be alphanumeric and cannot contain spaces!"
+    if not is_valid_email(email):
+        return "Invalid email address!"
+    if not is_valid_password(password):
+        return "Password does not meet the complexity rules!"
+    if user_type not in USER_TYPES:
+        return f"user_type must be one of {', '.join(USER_TYPES)}!"
+    if user_type == 'freelancer' and not (skills or '').strip():
+        return "Freelancer skills cannot be empty!"
+    return None
@@ -0,0 +1,44 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+import bulk_import
+
+VALID = {'username': 'alice', 'email': 'alice@example.com', 'password': 'Passw0rd!',
+         'user_type': 'freelancer', 'skills': 'python', 'experience': 3, 'hourly_rate': 20.5, 'bio': None}
+
+
+@pytest.mark.parametrize('field, value', [
+    ('username', 12345), ('email', ['alice@example.com']), ('password', 123456789),
+    ('user_type', True), ('skills', ['python']), ('bio', {'text': 'hi'}),
+])
+def test_validate_record_rejects_non_strings(field, value):
+    assert bulk_import.validate_record({**VALID, field: value}) == f"{field} must be a string!"
+
+
+def test_validate_record_accepts_json_numbers_and_nulls():
+    assert bulk_import.validate_record(VALID) is None
+
+
+def test_import_into_fresh_database(tmp_path):
+    source = tmp_path / 'accounts.jsonl'
+    source.write_text('\n'.join([
+        json.dumps(VALID),
+        json.dumps({**VALID, 'username': 42, 'email': 'n@example.com'}),
+        '[1, 2]',
+        json.dumps({**VALID, 'username': 'carol', 'email': 'carol@example.com', 'user_type': 'employer'}),
+    ]) + '\n')
+    db_path = str(tmp_path / 'platform.db')
+    errors_path = str(tmp_path / 'errors.csv')
+
+    stats = bulk_import.import_accounts(str(source), db_path, errors_path, workers=1)
+
+    assert (stats['read'], stats['imported'], stats['failed']) == (4, 2, 2)
+    with open(errors_path, newline='') as f:
+        assert [row['line_number'] for row in csv.DictReader(f)] == ['2', '3']
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT username FROM users ORDER BY id').fetchall() == [('alice',), ('carol',)]
+    assert conn.execute('SELECT COUNT(*) FROM freelancer_profiles').fetchone()[0] == 1
+    conn.close()
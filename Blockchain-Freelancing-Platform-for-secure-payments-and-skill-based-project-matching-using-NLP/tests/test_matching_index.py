@@ -0,0 +1,148 @@
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import matching_index
+from platform_service import init_db
+
+PROFILES = [
+    ('python django rest', 'backend apis', 'I build web services in python'),
+    ('solidity smart contracts', 'defi audits', 'Ethereum developer and auditor'),
+    ('react javascript css', 'frontend', 'Pixel perfect web interfaces'),
+    ('python machine learning', 'nlp models', 'Text classification and search'),
+    ('rust embedded', 'firmware', 'Low level systems programming'),
+    ('javascript node express', 'backend apis', 'Realtime web services'),
+    ('data analysis python pandas', 'reporting', 'Dashboards and notebooks'),
+    ('solidity python web3', 'dapps', 'Smart contract backends in python'),
+]
+
+
+def add_freelancer(conn, n, skills, experience, bio, user_id=None):
+    if user_id is None:
+        c = conn.execute("INSERT INTO users (username, email, password, user_type) VALUES (?, ?, 'x', 'freelancer')",
+                         (f'user{n}', f'user{n}@example.com'))
+        user_id = c.lastrowid
+    conn.execute('INSERT INTO freelancer_profiles (user_id, skills, experience, bio) VALUES (?, ?, ?, ?)',
+                 (user_id, skills, experience, bio))
+    conn.commit()
+    return user_id
+
+
+@pytest.fixture
+def db(tmp_path):
+    db_path = str(tmp_path / 'platform.db')
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    user_ids = [add_freelancer(conn, n, *profile) for n, profile in enumerate(PROFILES)]
+    yield db_path, conn, user_ids
+    conn.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_loaded():
+    matching_index._loaded.clear()
+    yield
+    matching_index._loaded.clear()
+
+
+@pytest.mark.parametrize('query', ['python web services', 'smart contracts solidity', 'javascript backend apis'])
+def test_search_matches_tfidf_reference(db, tmp_path, query):
+    db_path, _, user_ids = db
+    index_dir = str(tmp_path / 'index')
+    matching_index.rebuild_index(db_path, index_dir, chunk_size=3, workers=2)
+
+    texts = [matching_index.profile_text(*profile) for profile in PROFILES]
+    vectorizer = TfidfVectorizer(stop_words='english')
+    reference = (vectorizer.fit_transform(texts) @ vectorizer.transform([query]).T).toarray().ravel()
+    expected = sorted(((user_ids[i], score) for i, score in enumerate(reference) if score > 0),
+                      key=lambda x: (-x[1], x[0]))
+
+    results = matching_index.search(index_dir, db_path, query, limit=None)
+    assert [user_id for user_id, _ in results] == [user_id for user_id, _ in expected]
+    np.testing.assert_allclose([score for _, score in results], [score for _, score in expected], rtol=1e-5)
+
+    top = matching_index.search(index_dir, db_path, query, limit=2)
+    assert [user_id for user_id, _ in top] == [user_id for user_id, _ in expected[:2]]
+
+
+def test_rebuild_swaps_current_while_loaded_index_keeps_working(db, tmp_path):
+    db_path, conn, _ = db
+    index_dir = str(tmp_path / 'index')
+    first = matching_index.rebuild_index(db_path, index_dir, workers=1)
+    old_index = matching_index.load_index(index_dir)
+    before = matching_index.search(index_dir, db_path, 'python')
+
+    add_freelancer(conn, 100, 'python fastapi', 'backend', 'Async python services')
+    second = matching_index.rebuild_index(db_path, index_dir, workers=1)
+
+    assert second != first
+    assert matching_index.current_generation(index_dir) == second
+    assert matching_index.load_index(index_dir)['generation'] == second
+    assert len(matching_index.load_index(index_dir)['ids']) == len(PROFILES) + 1
+
+    # The mapped arrays of the previous generation are still readable
+    assert old_index['generation'] == first
+    assert os.path.isdir(os.path.join(index_dir, first))
+    query = np.zeros(old_index['matrix'].shape[1], dtype=np.float32)
+    query[old_index['matrix'][0].indices] = 1
+    assert (old_index['matrix'] @ query)[0] > 0
+    assert len(old_index['ids']) == len(PROFILES)
+    assert len(matching_index.search(index_dir, db_path, 'python')) == len(before) + 1
+
+
+def test_search_includes_profiles_added_after_build(db, tmp_path):
+    db_path, conn, user_ids = db
+    index_dir = str(tmp_path / 'index')
+    matching_index.rebuild_index(db_path, index_dir, workers=1)
+
+    # A second profile for an existing user sits below the highest indexed user id
+    add_freelancer(conn, None, 'firmware python', 'devices', 'Sensor drivers', user_id=user_ids[0])
+    new_user = add_freelancer(conn, 101, 'firmware', 'devices', 'Bootloaders')
+
+    results = dict(matching_index.search(index_dir, db_path, 'firmware'))
+    assert set(results) == {user_ids[0], user_ids[4], new_user}
+
+    # Terms the index has never seen still match new profiles
+    ops_user = add_freelancer(conn, 102, 'kubernetes', 'clusters', 'Helm charts')
+    assert [user_id for user_id, _ in matching_index.search(index_dir, db_path, 'kubernetes')] == [ops_user]
+
+
+def test_search_on_index_of_empty_corpus(tmp_path):
+    db_path = str(tmp_path / 'empty.db')
+    init_db(db_path)
+    index_dir = str(tmp_path / 'index')
+    matching_index.rebuild_index(db_path, index_dir, workers=1)
+    assert matching_index.search(index_dir, db_path, 'python') == []
+
+    conn = sqlite3.connect(db_path)
+    user_id = add_freelancer(conn, 1, 'python', 'apis', 'Backend services')
+    conn.close()
+    results = matching_index.search(index_dir, db_path, 'python')
+    assert [r[0] for r in results] == [user_id]
+    assert results[0][1] > 0
+
+
+def test_vocab_table_lookup():
+    rng = np.random.RandomState(0)
+    features = np.unique(rng.randint(0, matching_index.N_FEATURES, size=5000)).astype(np.int64)
+    keys, columns = matching_index._build_vocab_table(features)
+
+    assert len(keys) >= 2 * len(features)
+    np.testing.assert_array_equal(matching_index._lookup_columns(keys, columns, features), np.arange(len(features)))
+    missing = np.setdiff1d(np.arange(matching_index.N_FEATURES, dtype=np.int64), features)[:500]
+    assert (matching_index._lookup_columns(keys, columns, missing) == -1).all()
+
+
+def test_index_rows_have_sorted_columns(db, tmp_path):
+    db_path, _, _ = db
+    index_dir = str(tmp_path / 'index')
+    matching_index.rebuild_index(db_path, index_dir, chunk_size=3, workers=2)
+    matrix = matching_index.load_index(index_dir)['matrix']
+
+    for row in range(matrix.shape[0]):
+        columns = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        assert (np.diff(columns) > 0).all()
+    np.testing.assert_allclose(np.sqrt(matrix.multiply(matrix).sum(axis=1)).A.ravel(), 1, rtol=1e-5)
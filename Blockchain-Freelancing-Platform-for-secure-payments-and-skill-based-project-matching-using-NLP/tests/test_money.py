@@ -0,0 +1,158 @@
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+import money
+from platform_service import init_db
+from tx_ledger import TxLedger
+
+# projects as created before wei storage
+BASELINE_PROJECTS = '''CREATE TABLE projects
+                (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                employer_id INTEGER,
+                freelancer_id INTEGER,
+                status TEXT DEFAULT 'open',
+                budget REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                contract_address TEXT,
+                FOREIGN KEY (employer_id) REFERENCES users(id),
+                FOREIGN KEY (freelancer_id) REFERENCES users(id))'''
+
+# tx_ledger with the fee in a single wei column
+SINGLE_FEE_LEDGER = '''CREATE TABLE tx_ledger
+                (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER,
+                contract_address TEXT,
+                action TEXT NOT NULL,
+                tx_hash TEXT NOT NULL,
+                status INTEGER,
+                gas_used INTEGER,
+                effective_gas_price INTEGER,
+                fee_wei INTEGER,
+                latency_ms INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)'''
+
+
+@pytest.mark.parametrize('amount, wei', [
+    ('1.5', 1_500_000_000_000_000_000),
+    (0.1, 100_000_000_000_000_000),
+    (2, 2 * 10 ** 18),
+    (Decimal('0.000000000000000001'), 1),
+    ('1e-18', 1),
+    ('0', 0),
+    ('100', 100 * 10 ** 18),
+    ('115792089237316195423570985008687907853269984665640564039457.584007913129639935', 2 ** 256 - 1),
+])
+def test_to_wei(amount, wei):
+    assert money.to_wei(amount) == wei
+
+
+@pytest.mark.parametrize('amount', ['1e-19', '0.0000000000000000015', '-1', 'abc', 'NaN', 'Infinity', ''])
+def test_to_wei_rejects_inexact_or_invalid(amount):
+    with pytest.raises(ValueError):
+        money.to_wei(amount)
+
+
+def test_to_wei_rejects_unknown_currency():
+    with pytest.raises(ValueError):
+        money.to_wei('1', 'BTC')
+
+
+@pytest.mark.parametrize('wei, text', [
+    (0, '0 ETH'),
+    (1, '0.000000000000000001 ETH'),
+    (10 ** 18, '1 ETH'),
+    (1_500_000_000_000_000_000, '1.5 ETH'),
+    (100 * 10 ** 18 + 1, '100.000000000000000001 ETH'),
+])
+def test_format_amount(wei, text):
+    assert money.format_amount(wei) == text
+    assert money.to_wei(text.split()[0]) == wei
+
+
+@pytest.mark.parametrize('wei', [0, 1, money.GWEI - 1, money.GWEI, money.GWEI + 1, 2 ** 63, 2 ** 256 - 1])
+def test_split_join_round_trip(wei):
+    gwei, remainder = money.split_wei(wei)
+    assert 0 <= remainder < money.GWEI
+    assert money.join_wei(gwei, remainder) == wei
+
+
+def test_join_wei_combines_column_sums():
+    amounts = [money.GWEI - 1, money.GWEI - 1, 5 * 10 ** 18 + 3, 7 * 10 ** 18]
+    parts = [money.split_wei(wei) for wei in amounts]
+    assert money.join_wei(sum(p[0] for p in parts), sum(p[1] for p in parts)) == sum(amounts)
+    assert money.join_wei(None, None) == 0
+
+
+def test_migrate_projects_from_baseline_schema(tmp_path, capsys):
+    db_path = str(tmp_path / 'platform.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute(BASELINE_PROJECTS)
+    budgets = [1.5, 0.1, 100.0, None, 1e-20, -2.0, 'abc']
+    conn.executemany("INSERT INTO projects (title, description, employer_id, status, budget, contract_address) "
+                     "VALUES (?, 'desc', 7, 'assigned', ?, '0xabc')", [(f'p{i}', b) for i, b in enumerate(budgets)])
+    conn.commit()
+    conn.close()
+
+    init_db(db_path)
+
+    conn = sqlite3.connect(db_path)
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(projects)')]
+    assert 'budget' not in columns
+    rows = conn.execute('''SELECT title, employer_id, status, contract_address, budget_gwei, budget_wei_remainder,
+                        currency FROM projects ORDER BY id''').fetchall()
+    assert [row[:4] for row in rows] == [(f'p{i}', 7, 'assigned', '0xabc') for i in range(len(budgets))]
+    assert [money.join_wei(row[4], row[5]) for row in rows] == [
+        1_500_000_000_000_000_000, 10 ** 17, 100 * 10 ** 18, 0, 0, 0, 0]
+    assert {row[6] for row in rows} == {'ETH'}
+
+    # Rounded or zeroed rows are reported by rowid instead of failing the start-up
+    reported = capsys.readouterr().out
+    assert 'projects row 5:' in reported and 'projects row 6:' in reported and 'projects row 7:' in reported
+    assert 'projects row 1:' not in reported
+
+    # Already migrated tables are left alone
+    assert money.migrate_amount_column(conn, 'projects', '()', 'budget', 'budget') == 0
+    conn.close()
+
+
+def test_migrate_single_column_fee_ledger(tmp_path):
+    db_path = str(tmp_path / 'platform.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute(SINGLE_FEE_LEDGER)
+    fees = [21000 * 2_000_000_000, 2 ** 63 - 1]
+    conn.executemany("INSERT INTO tx_ledger (action, tx_hash, status, gas_used, effective_gas_price, fee_wei, "
+                     "latency_ms) VALUES ('release', '0x01', 1, 21000, 1, ?, 5)", [(fee,) for fee in fees])
+    conn.commit()
+    conn.close()
+
+    ledger = TxLedger(db_path)
+
+    assert ledger.action_percentiles()['release']['fee_wei_p99'] == 2 ** 63 - 1
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT fee_gwei, fee_wei_remainder FROM tx_ledger ORDER BY id').fetchall()
+    assert [money.join_wei(*row) for row in rows] == fees
+    assert 'fee_wei' not in [row[1] for row in conn.execute('PRAGMA table_info(tx_ledger)')]
+    conn.close()
+
+
+def test_project_fee_totals_exceed_int64(tmp_path):
+    db_path = str(tmp_path / 'platform.db')
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO projects (title, description, employer_id, contract_address) "
+                 "VALUES ('big', 'desc', 1, '0xabc')")
+    conn.commit()
+    conn.close()
+
+    ledger = TxLedger(db_path)
+    # Two fees of 6 ETH each sum past the 64-bit limit of a single wei column
+    for tx_hash in (b'\x01', b'\x02'):
+        receipt = {'transactionHash': tx_hash, 'status': 1, 'gasUsed': 3, 'effectiveGasPrice': 2 * 10 ** 18}
+        ledger.record('release', receipt, 1, 0.25, '0xabc')
+
+    totals = ledger.project_totals(employer_id=1)
+    assert [(t['title'], t['transactions'], t['fee_wei']) for t in totals] == [('big', 2, 12 * 10 ** 18)]
@@ -0,0 +1,153 @@
+import json
+import time
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from rpc_transport import PooledHTTPProvider, CircuitBreaker, CircuitOpenError
+
+
+class StubNode:
+    """JSON-RPC endpoint that counts POSTs per method; per-method delay and HTTP status are adjustable."""
+
+    def __init__(self):
+        self.posts = Counter()
+        self.delay = {}
+        self.status = {}
+        self.lock = threading.Lock()
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                method = request['method']
+                with node.lock:
+                    node.posts[method] += 1
+                time.sleep(node.delay.get(method, 0))
+                status = node.status.get(method, 200)
+                body = json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': '0x1'}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def node():
+    node = StubNode()
+    yield node
+    node.server.shutdown()
+    node.server.server_close()
+
+
+def run_concurrently(count, call):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = call()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_concurrent_reads_share_one_post(node):
+    node.delay['eth_gasPrice'] = 0.3
+    provider = PooledHTTPProvider(node.url)
+
+    results = run_concurrently(8, lambda: provider.make_request('eth_gasPrice', []))
+
+    assert node.posts['eth_gasPrice'] == 1
+    assert all(result['result'] == '0x1' for result in results)
+    # Nothing stays registered once the shared request finished
+    assert provider._in_flight == {}
+    provider.make_request('eth_gasPrice', [])
+    assert node.posts['eth_gasPrice'] == 2
+
+
+def test_send_raw_transaction_is_never_retried(node):
+    node.status['eth_sendRawTransaction'] = 502
+    provider = PooledHTTPProvider(node.url, max_retries=3, backoff=0)
+
+    with pytest.raises(requests.HTTPError):
+        provider.make_request('eth_sendRawTransaction', ['0xdead'])
+    assert node.posts['eth_sendRawTransaction'] == 1
+
+    # A read that fails the same way is retried up to max_retries
+    node.status['eth_blockNumber'] = 502
+    with pytest.raises(requests.HTTPError):
+        provider.make_request('eth_blockNumber', [])
+    assert node.posts['eth_blockNumber'] == 4
+
+
+def test_send_raw_transaction_is_never_coalesced(node):
+    node.delay['eth_sendRawTransaction'] = 0.3
+    provider = PooledHTTPProvider(node.url)
+
+    results = run_concurrently(4, lambda: provider.make_request('eth_sendRawTransaction', ['0xdead']))
+
+    assert node.posts['eth_sendRawTransaction'] == 4
+    assert all(result['result'] == '0x1' for result in results)
+
+
+def test_breaker_opens_probes_once_and_closes(node):
+    node.status['eth_blockNumber'] = 503
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+    provider = PooledHTTPProvider(node.url, max_retries=0, breaker=breaker)
+
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            provider.make_request('eth_blockNumber', [])
+    # Open: fails fast without contacting the node
+    with pytest.raises(CircuitOpenError):
+        provider.make_request('eth_blockNumber', [])
+    assert node.posts['eth_blockNumber'] == 3
+
+    # After the reset timeout exactly one caller probes; the rest keep failing fast
+    time.sleep(0.25)
+    node.status['eth_blockNumber'] = 200
+    node.delay['eth_blockNumber'] = 0.3
+    results = run_concurrently(6, lambda: provider.make_request('eth_blockNumber', [threading.get_ident()]))
+    assert node.posts['eth_blockNumber'] == 4
+    assert sum(isinstance(result, dict) for result in results) == 1
+    assert sum(isinstance(result, CircuitOpenError) for result in results) == 5
+
+    # The successful probe closed the breaker
+    node.delay['eth_blockNumber'] = 0
+    assert provider.make_request('eth_blockNumber', [])['result'] == '0x1'
+    assert node.posts['eth_blockNumber'] == 5
+
+
+def test_failed_probe_reopens_the_breaker(node):
+    node.status['eth_chainId'] = 503
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    provider = PooledHTTPProvider(node.url, max_retries=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            provider.make_request('eth_chainId', [])
+    time.sleep(0.25)
+    with pytest.raises(requests.HTTPError):
+        provider.make_request('eth_chainId', [])
+    with pytest.raises(CircuitOpenError):
+        provider.make_request('eth_chainId', [])
+    assert node.posts['eth_chainId'] == 3
@@ -0,0 +1,29 @@
+import pytest
+
+from validation import validate_registration
+
+VALID = ('alice', 'alice@example.com', 'Passw0rd!', 'employer')
+
+
+def test_validate_registration_accepts_valid_accounts():
+    assert validate_registration(*VALID) is None
+    assert validate_registration('bob', 'bob@example.com', 'Passw0rd!', 'freelancer', 'python') is None
+
+
+@pytest.mark.parametrize('field, value, error', [
+    (0, '', "Username cannot be empty!"),
+    (0, 'alice smith', "Username must be alphanumeric and cannot contain spaces!"),
+    (1, 'alice@', "Invalid email address!"),
+    (2, 'password', "Password does not meet the complexity rules!"),
+    (3, 'admin', "user_type must be one of employer, freelancer!"),
+])
+def test_validate_registration_rejects_bad_fields(field, value, error):
+    fields = list(VALID)
+    fields[field] = value
+    assert validate_registration(*fields) == error
+
+
+@pytest.mark.parametrize('skills', [None, '', '   '])
+def test_validate_registration_requires_freelancer_skills(skills):
+    assert validate_registration('bob', 'bob@example.com', 'Passw0rd!', 'freelancer', skills) == \
+        "Freelancer skills cannot be empty!"